@@ -1,659 +1,57 @@
-import os
-import time
-import base64
-from datetime import datetime
-from collections import Counter
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
-from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
-
-app = Flask(__name__)
-app.secret_key = 'art_top_secret'
-
-# --- КОНФИГУРАЦИЯ ТИПОВ ---
-CONTENT_TYPES = ["Drawing", "Tutorial", "Pose", "Gamma", "Character Design", "Other"]
-
-# DB Config
-basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'database.db')
-app.config['UPLOAD_FOLDER'] = os.path.join(basedir, 'static', 'uploads')
-db = SQLAlchemy(app)
-
-@app.context_processor
-def inject_types():
-    return dict(content_types=CONTENT_TYPES)
-
-# --- MODELS ---
-
-class User(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80))
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    password = db.Column(db.String(200), nullable=False)
-    avatar = db.Column(db.String(200), default='default_avatar.svg')
-    bio = db.Column(db.Text, nullable=True)
-    rating = db.Column(db.Integer, default=0)
-    subscribers_count = db.Column(db.Integer, default=0)
-
-class Publication(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    image = db.Column(db.String(200))
-    description = db.Column(db.Text, nullable=True)
-    hashtags = db.Column(db.String(200))
-    pub_type = db.Column(db.String(50)) 
-    author_id = db.Column(db.Integer, db.ForeignKey('user.id'))
-    title = db.Column(db.String(100))
-    pinned = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-class Remix(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    image = db.Column(db.String(200)) 
-    original_pub_id = db.Column(db.Integer, db.ForeignKey('publication.id'))
-    author_id = db.Column(db.Integer, db.ForeignKey('user.id'))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    author = db.relationship('User', backref='remixes')
-    original = db.relationship('Publication', backref='remixes')
-
-# Модель для комментариев к ремиксам
-class RemixComment(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    remix_id = db.Column(db.Integer, db.ForeignKey('remix.id'))
-    author_id = db.Column(db.Integer, db.ForeignKey('user.id'))
-    text = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    author = db.relationship('User', backref='remix_comments')
-    remix = db.relationship('Remix', backref='comments')
-
-# [НОВОЕ] Модель для комментариев к оригинальным публикациям
-class PublicationComment(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    pub_id = db.Column(db.Integer, db.ForeignKey('publication.id'))
-    author_id = db.Column(db.Integer, db.ForeignKey('user.id'))
-    text = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    author = db.relationship('User', backref='pub_comments')
-    publication = db.relationship('Publication', backref='comments')
-
-# Модель для лайков публикаций
-class PublicationLike(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    pub_id = db.Column(db.Integer, db.ForeignKey('publication.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    # Уникальная пара: один пользователь может лайкнуть публикацию только один раз
-    __table_args__ = (db.UniqueConstraint('pub_id', 'user_id', name='_pub_user_like_uc'),)
-    
-    user = db.relationship('User', backref='pub_likes')
-    publication = db.relationship('Publication', backref='likes')
-
-# Модель для лайков ремиксов
-class RemixLike(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    remix_id = db.Column(db.Integer, db.ForeignKey('remix.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    # Уникальная пара: один пользователь может лайкнуть ремикс только один раз
-    __table_args__ = (db.UniqueConstraint('remix_id', 'user_id', name='_remix_user_like_uc'),)
-    
-    user = db.relationship('User', backref='remix_likes')
-    remix = db.relationship('Remix', backref='likes')
-
-# Модель для подписок
-class Subscription(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    follower_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # кто подписывается
-    following_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # на кого подписываются
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    # Уникальная пара: один пользователь может подписаться на другого только один раз
-    __table_args__ = (db.UniqueConstraint('follower_id', 'following_id', name='_follower_following_uc'),)
-    
-    follower = db.relationship('User', foreign_keys=[follower_id], backref='following')
-    following = db.relationship('User', foreign_keys=[following_id], backref='followers')
-
-with app.app_context():
-    db.create_all()
-
-# --- ROUTES ---
-
-@app.route('/')
-def index(): return render_template('index.html')
-
-@app.route('/auth')
-def auth(): return render_template('auth.html')
-
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    if request.method == 'POST':
-        email = request.form['email']
-        if User.query.filter_by(email=email).first():
-            return "Email exists!"
-        hashed_pw = generate_password_hash(request.form['password'])
-        new_user = User(
-            username=request.form['name'], 
-            email=email, 
-            password=hashed_pw,
-            avatar='default_avatar.svg'
-        )
-        db.session.add(new_user)
-        db.session.commit()
-        return redirect(url_for('login'))
-    return render_template('register.html')
-
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if request.method == 'POST':
-        email = request.form.get('email')
-        password = request.form.get('password')
-        user = User.query.filter_by(email=email).first()
-        
-        if not user or not check_password_hash(user.password, password):
-            return "Error: Wrong credentials"
-            
-        session['user_id'] = user.id
-        return redirect(url_for('home'))
-
-    return render_template('login.html')
-
-@app.route('/home')
-def home():
-    if 'user_id' not in session:
-        return redirect(url_for('auth'))
-    
-    current_user_id = session['user_id']
-    active_type = request.args.get('pub_type', 'Все типы')
-    search_query = request.args.get('search') 
-    page = request.args.get('page', 1, type=int)
-    
-    # Получаем подписки текущего пользователя
-    subscriptions = Subscription.query.filter_by(follower_id=current_user_id).all()
-    following_ids = [sub.following_id for sub in subscriptions]
-    
-    # Получаем публикации от тех, на кого подписан пользователь
-    subscribed_pubs = []
-    if following_ids:
-        subscribed_pubs = Publication.query.filter(
-            Publication.author_id.in_(following_ids)
-        ).order_by(Publication.created_at.desc()).limit(20).all()
-    
-    query = Publication.query
-    if active_type != 'Все типы':
-        query = query.filter_by(pub_type=active_type)
-
-    if search_query is not None:
-        if search_query.strip() and search_query != 'Все':
-            query = query.filter(Publication.hashtags.contains(search_query))
-        
-        pagination = query.order_by(Publication.id.desc()).paginate(page=page, per_page=30, error_out=False)
-        
-        return render_template('home.html', 
-                               mode='grid', 
-                               pubs=pagination.items, 
-                               search_query=search_query, 
-                               active_type=active_type,
-                               next_page=page+1 if pagination.has_next else None,
-                               subscribed_pubs=[])
-
-    all_pubs = query.order_by(Publication.id.desc()).all()
-    
-    all_tags = []
-    for p in all_pubs:
-        if p.hashtags:
-            tags = [t.strip().replace('#', '') for t in p.hashtags.replace(' ', ',').split(',') if t.strip()]
-            all_tags.extend(tags)
-    
-    top_tags = [tag for tag, count in Counter(all_tags).most_common(5)]
-    
-    return render_template('home.html', 
-                           mode='feed', 
-                           all_pubs=all_pubs, 
-                           top_tags=top_tags, 
-                           active_type=active_type,
-                           search_query=None,
-                           subscribed_pubs=subscribed_pubs)
-
-@app.route('/publish', methods=['GET', 'POST'])
-def create_pub():
-    if 'user_id' not in session: return redirect(url_for('login'))
-    
-    if request.method == 'POST':
-        file = request.files['image']
-        if file:
-            filename = secure_filename(file.filename)
-            file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-            
-            new_pub = Publication(
-                image=filename,
-                description=request.form['description'],
-                hashtags=request.form['hashtags'],
-                pub_type=request.form['pub_type'],
-                author_id=session['user_id'],
-                title=request.form['title']
-            )
-            db.session.add(new_pub)
-            db.session.commit()
-            return redirect(url_for('home'))
-        
-    return render_template('create_pub.html', pub=None)
-
-@app.route('/delete/<int:id>')
-def delete_pub(id):
-    pub = Publication.query.get(id)
-    if pub and pub.author_id == session.get('user_id'):
-        db.session.delete(pub)
-        db.session.commit()
-    return redirect(url_for('home'))
-
-@app.route('/get_post/<int:id>')
-def get_post(id):
-    pub = Publication.query.get_or_404(id)
-    author = User.query.get(pub.author_id)
-    
-    current_user_id = session.get('user_id')
-    
-    # Подсчет лайков и проверка, лайкнул ли текущий пользователь публикацию
-    pub_like_count = PublicationLike.query.filter_by(pub_id=pub.id).count()
-    pub_user_liked = False
-    if current_user_id:
-        pub_user_liked = PublicationLike.query.filter_by(pub_id=pub.id, user_id=current_user_id).first() is not None
-    
-    # Проверка подписки на автора публикации
-    is_subscribed_to_author = False
-    if current_user_id and current_user_id != pub.author_id:
-        is_subscribed_to_author = Subscription.query.filter_by(
-            follower_id=current_user_id,
-            following_id=pub.author_id
-        ).first() is not None
-    
-    remixes_list = []
-    remixes = Remix.query.filter_by(original_pub_id=pub.id).all()
-    
-    # Собираем данные ремиксов с количеством лайков
-    for r in remixes:
-        # Подсчет лайков для каждого ремикса
-        remix_like_count = RemixLike.query.filter_by(remix_id=r.id).count()
-        remix_user_liked = False
-        if current_user_id:
-            remix_user_liked = RemixLike.query.filter_by(remix_id=r.id, user_id=current_user_id).first() is not None
-        
-        # Проверка подписки на автора ремикса
-        is_subscribed_to_remix_author = False
-        if current_user_id and current_user_id != r.author_id:
-            is_subscribed_to_remix_author = Subscription.query.filter_by(
-                follower_id=current_user_id,
-                following_id=r.author_id
-            ).first() is not None
-        
-        remixes_list.append({
-            'id': r.id,
-            'image': r.image,
-            'author_name': r.author.username,
-            'author_id': r.author_id,
-            'date': r.created_at.strftime('%d.%m.%Y'),
-            'like_count': remix_like_count,
-            'user_liked': remix_user_liked,
-            'is_subscribed': is_subscribed_to_remix_author
-        })
-    
-    # Сортируем ремиксы по количеству лайков (от большего к меньшему)
-    remixes_list.sort(key=lambda x: x['like_count'], reverse=True)
-
-    return jsonify({
-        'id': pub.id,
-        'image': pub.image,
-        'description': pub.description,
-        'hashtags': pub.hashtags,
-        'pub_type': pub.pub_type,
-        'title': pub.title,
-        'author_name': author.username if author else "Unknown",
-        'author_id': pub.author_id,
-        'is_owner': pub.author_id == session.get('user_id'),
-        'current_user_id': session.get('user_id'),
-        'remixes': remixes_list,
-        'like_count': pub_like_count,
-        'user_liked': pub_user_liked,
-        'is_subscribed': is_subscribed_to_author
-    })
-
-@app.route('/edit/<int:id>', methods=['POST'])
-def edit_pub(id):
-    pub = Publication.query.get_or_404(id)
-    if pub.author_id != session.get('user_id'):
-        return "Access Denied", 403
-    
-    pub.description = request.form.get('description')
-    pub.hashtags = request.form.get('hashtags')
-    pub.pub_type = request.form.get('pub_type')
-    db.session.commit()
-    return redirect(url_for('home'))
-
-# --- EDITOR & REMIX ROUTES ---
-
-@app.route('/editor/<int:original_id>')
-def editor(original_id):
-    if 'user_id' not in session:
-        return redirect(url_for('login'))
-    pub = Publication.query.get_or_404(original_id)
-    return render_template('editor.html', pub=pub)
-
-@app.route('/save_remix', methods=['POST'])
-def save_remix():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    data = request.json
-    image_data = data['image']
-    original_id = data['original_id']
-    
-    try:
-        header, encoded = image_data.split(",", 1)
-        file_data = base64.b64decode(encoded)
-        
-        filename = f"remix_{original_id}_{int(time.time())}.png"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        
-        with open(filepath, "wb") as f:
-            f.write(file_data)
-            
-        new_remix = Remix(
-            image=filename,
-            original_pub_id=original_id,
-            author_id=session['user_id']
-        )
-        db.session.add(new_remix)
-        db.session.commit()
-        
-        return jsonify({'status': 'success', 'remix_id': new_remix.id})
-    except Exception as e:
-        print(e)
-        return jsonify({'error': 'Failed to save'}), 500
-
-@app.route('/delete_remix/<int:id>', methods=['POST'])
-def delete_remix(id):
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    remix = Remix.query.get_or_404(id)
-    if remix.author_id != session['user_id']:
-        return jsonify({'error': 'Access Denied'}), 403
-    
-    try:
-        os.remove(os.path.join(app.config['UPLOAD_FOLDER'], remix.image))
-    except:
-        pass
-    
-    db.session.delete(remix)
-    db.session.commit()
-    return jsonify({'status': 'success'})
-
-@app.route('/add_remix_comment', methods=['POST'])
-def add_remix_comment():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    data = request.json
-    text = data.get('text')
-    remix_id = data.get('remix_id')
-    
-    if not text or not remix_id:
-        return jsonify({'error': 'Missing data'}), 400
-        
-    comment = RemixComment(
-        remix_id=remix_id,
-        author_id=session['user_id'],
-        text=text
-    )
-    db.session.add(comment)
-    db.session.commit()
-    
-    return jsonify({
-        'status': 'success',
-        'author': User.query.get(session['user_id']).username,
-        'text': text,
-        'date': datetime.utcnow().strftime('%d.%m.%Y %H:%M')
-    })
-
-@app.route('/get_remix_comments/<int:remix_id>')
-def get_remix_comments(remix_id):
-    comments = RemixComment.query.filter_by(remix_id=remix_id).order_by(RemixComment.created_at.asc()).all()
-    result = []
-    for c in comments:
-        result.append({
-            'author': c.author.username,
-            'author_id': c.author.id,
-            'text': c.text,
-            'date': c.created_at.strftime('%d.%m.%Y %H:%M')
-        })
-    return jsonify({'comments': result})
-
-# [НОВОЕ] Добавление комментария к ОРИГИНАЛУ
-@app.route('/add_pub_comment', methods=['POST'])
-def add_pub_comment():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    data = request.json
-    text = data.get('text')
-    pub_id = data.get('pub_id')
-    
-    if not text or not pub_id:
-        return jsonify({'error': 'Missing data'}), 400
-        
-    comment = PublicationComment(
-        pub_id=pub_id,
-        author_id=session['user_id'],
-        text=text
-    )
-    db.session.add(comment)
-    db.session.commit()
-    
-    return jsonify({
-        'status': 'success',
-        'author': User.query.get(session['user_id']).username,
-        'text': text,
-        'date': datetime.utcnow().strftime('%d.%m.%Y %H:%M')
-    })
-
-# [НОВОЕ] Получение комментариев ОРИГИНАЛА
-@app.route('/get_pub_comments/<int:pub_id>')
-def get_pub_comments(pub_id):
-    comments = PublicationComment.query.filter_by(pub_id=pub_id).order_by(PublicationComment.created_at.asc()).all()
-    result = []
-    for c in comments:
-        result.append({
-            'author': c.author.username,
-            'author_id': c.author.id,
-            'text': c.text,
-            'date': c.created_at.strftime('%d.%m.%Y %H:%M')
-        })
-    return jsonify({'comments': result})
-
-# --- LIKES ROUTES ---
-
-@app.route('/toggle_pub_like/<int:pub_id>', methods=['POST'])
-def toggle_pub_like(pub_id):
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    user_id = session['user_id']
-    existing_like = PublicationLike.query.filter_by(pub_id=pub_id, user_id=user_id).first()
-    
-    if existing_like:
-        # Убираем лайк
-        db.session.delete(existing_like)
-        db.session.commit()
-        liked = False
-    else:
-        # Ставим лайк
-        new_like = PublicationLike(pub_id=pub_id, user_id=user_id)
-        db.session.add(new_like)
-        db.session.commit()
-        liked = True
-    
-    # Подсчитываем общее количество лайков
-    like_count = PublicationLike.query.filter_by(pub_id=pub_id).count()
-    
-    return jsonify({'liked': liked, 'like_count': like_count})
-
-@app.route('/toggle_remix_like/<int:remix_id>', methods=['POST'])
-def toggle_remix_like(remix_id):
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    user_id = session['user_id']
-    existing_like = RemixLike.query.filter_by(remix_id=remix_id, user_id=user_id).first()
-    
-    if existing_like:
-        # Убираем лайк
-        db.session.delete(existing_like)
-        db.session.commit()
-        liked = False
-    else:
-        # Ставим лайк
-        new_like = RemixLike(remix_id=remix_id, user_id=user_id)
-        db.session.add(new_like)
-        db.session.commit()
-        liked = True
-    
-    # Подсчитываем общее количество лайков
-    like_count = RemixLike.query.filter_by(remix_id=remix_id).count()
-    
-    return jsonify({'liked': liked, 'like_count': like_count})
-
-# --- PROFILE ROUTES ---
-
-@app.route('/profile/<int:user_id>')
-def profile(user_id):
-    if 'user_id' not in session:
-        return redirect(url_for('auth'))
-    
-    # Получаем информацию о пользователе
-    user = User.query.get_or_404(user_id)
-    current_user_id = session['user_id']
-    is_own_profile = (current_user_id == user_id)
-    
-    # Проверяем, подписан ли текущий пользователь на этого пользователя
-    is_subscribed = False
-    if not is_own_profile:
-        is_subscribed = Subscription.query.filter_by(
-            follower_id=current_user_id,
-            following_id=user_id
-        ).first() is not None
-    
-    # Получаем фильтр по типу (если есть)
-    pub_type_filter = request.args.get('pub_type', 'Все типы')
-    
-    # Получаем публикации пользователя
-    query = Publication.query.filter_by(author_id=user_id)
-    
-    if pub_type_filter != 'Все типы':
-        query = query.filter_by(pub_type=pub_type_filter)
-    
-    # Сортировка: закрепленные вверху, затем по дате (новые первые)
-    publications = query.order_by(Publication.pinned.desc(), Publication.created_at.desc()).all()
-    
-    return render_template('profile.html', 
-                         user=user, 
-                         publications=publications,
-                         is_own_profile=is_own_profile,
-                         is_subscribed=is_subscribed,
-                         active_type=pub_type_filter,
-                         content_types=CONTENT_TYPES)
-
-@app.route('/profile/edit', methods=['GET', 'POST'])
-def edit_profile():
-    if 'user_id' not in session:
-        return redirect(url_for('auth'))
-    
-    user = User.query.get_or_404(session['user_id'])
-    
-    if request.method == 'POST':
-        user.username = request.form.get('username', user.username)
-        user.bio = request.form.get('bio', user.bio)
-        
-        # Обработка аватарки
-        if 'avatar' in request.files:
-            file = request.files['avatar']
-            if file and file.filename:
-                filename = secure_filename(file.filename)
-                timestamp = str(int(time.time()))
-                filename = f"avatar_{user.id}_{timestamp}_{filename}"
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-                user.avatar = filename
-        
-        db.session.commit()
-        flash('Профиль успешно обновлен!', 'success')
-        return redirect(url_for('profile', user_id=user.id))
-    
-    return render_template('edit_profile.html', user=user)
-
-@app.route('/pin_post/<int:post_id>', methods=['POST'])
-def pin_post(post_id):
-    if 'user_id' not in session:
-        return jsonify({'error': 'Not authorized'}), 401
-    
-    user_id = session['user_id']
-    post = Publication.query.get_or_404(post_id)
-    
-    # Проверяем, что это публикация текущего пользователя
-    if post.author_id != user_id:
-        return jsonify({'error': 'Not your post'}), 403
-    
-    # Переключаем статус закрепления
-    post.pinned = not post.pinned
-    db.session.commit()
-    
-    return jsonify({'success': True, 'pinned': post.pinned})
-
-@app.route('/subscribe/<int:user_id>', methods=['POST'])
-def subscribe(user_id):
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    current_user_id = session['user_id']
-    
-    # Нельзя подписаться на самого себя
-    if current_user_id == user_id:
-        return jsonify({'error': 'Cannot subscribe to yourself'}), 400
-    
-    # Проверяем существование пользователя
-    target_user = User.query.get_or_404(user_id)
-    
-    # Проверяем, есть ли уже подписка
-    existing_sub = Subscription.query.filter_by(
-        follower_id=current_user_id,
-        following_id=user_id
-    ).first()
-    
-    if existing_sub:
-        # Отписываемся
-        db.session.delete(existing_sub)
-        target_user.subscribers_count = max(0, target_user.subscribers_count - 1)
-        db.session.commit()
-        subscribed = False
-    else:
-        # Подписываемся
-        new_sub = Subscription(
-            follower_id=current_user_id,
-            following_id=user_id
-        )
-        db.session.add(new_sub)
-        target_user.subscribers_count += 1
-        db.session.commit()
-        subscribed = True
-    
-    return jsonify({
-        'subscribed': subscribed,
-        'subscribers_count': target_user.subscribers_count
-    })
+from importlib import import_module
+from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+# Импорт модуля ничего не делает: приложение собирается в create_app.
+# Запуск:
+#   python app.py                          (отладочный сервер)
+#   gunicorn 'app:create_app()'            (см. readme.md)
+#   flask --app app init-db                (создать схему новой базы)
+
+# Разделы сайта (модуль, blueprint bp); модули импортируются внутри create_app
+BLUEPRINTS = [
+    'blueprints.auth',
+    'blueprints.feed',
+    'blueprints.posts',
+    'blueprints.remixes',
+    'blueprints.social',
+    'blueprints.profile',
+    'blueprints.media',
+]
+
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.from_object('config')
+    if config:
+        app.config.update(config)
+    if app.config['TRUSTED_PROXIES']:
+        # За nginx request.remote_addr - адрес прокси; настоящий адрес клиента в X-Forwarded-For
+        proxies = app.config['TRUSTED_PROXIES']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
+
+    # Расширения и модели подключаются здесь, а не при импорте: сборка приложения
+    # не открывает соединений с базой и не проверяет схему (это делает init-db)
+    from extensions import init_extensions
+    from helpers import compress_json, cached_fragment, media_base_url, media_url, user_scope
+    from commands import COMMANDS
+
+    init_extensions(app)
+
+    @app.context_processor
+    def inject_types():
+        return dict(content_types=app.config['CONTENT_TYPES'])
+
+    app.jinja_env.globals.update(cached_fragment=cached_fragment, user_scope=user_scope,
+                                  media_url=media_url, media_base_url=media_base_url)
+    app.after_request(compress_json)
+
+    for name in BLUEPRINTS:
+        app.register_blueprint(import_module(name).bp)
+
+    for command in COMMANDS:
+        app.cli.add_command(command)
+
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0')
\ No newline at end of file
+    create_app().run(debug=True, host='0.0.0.0')
@@ -0,0 +1,109 @@
+"""
+Cold start: import, application factory and first request.
+
+Every sample runs in a fresh interpreter, the way a forked worker, a test
+process or a `flask --app app ...` invocation starts. Reported per phase
+(median of RUNS samples):
+
+    import app      importing the module (the factory is not called)
+    create_app()    building the app: config, extensions, blueprints, commands
+    first request   GET / through the test client (templates are compiled)
+    forked worker   fork of the built app until its first response, i.e. a
+                    worker of `gunicorn --preload` (POSIX only)
+
+It also checks that startup is side-effect free: building the app must not
+open the database (SQLite creates the file on the first connection), which
+is also what makes forking a preloaded app safe.
+
+    python benchmarks/cold_start.py [--runs N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 15
+PHASES = ['import app', 'create_app()', 'forked worker', 'first request']
+
+
+def sample():
+    """One measurement; runs in the child interpreter and prints JSON."""
+    sys.path.insert(0, APP_DIR)
+    db_path = os.path.join(tempfile.mkdtemp(), 'cold.db')
+
+    started = time.perf_counter()
+    import app
+    imported = time.perf_counter()
+    flask_app = app.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path})
+    created = time.perf_counter()
+
+    db_created = os.path.exists(db_path)
+    forked = _forked_first_request(flask_app)
+
+    requested = time.perf_counter()
+    flask_app.test_client().get('/')
+    served = time.perf_counter()
+
+    print(json.dumps({
+        'import app': imported - started,
+        'create_app()': created - imported,
+        'first request': served - requested,
+        'forked worker': forked,
+        'db_created': db_created,
+        'modules': len(sys.modules),
+    }))
+
+
+def _forked_first_request(flask_app):
+    if not hasattr(os, 'fork'):
+        return None
+    read_fd, write_fd = os.pipe()
+    started = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        flask_app.test_client().get('/')
+        os.write(write_fd, str(time.perf_counter() - started).encode())
+        os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as result:
+        elapsed = float(result.read())
+    os.waitpid(pid, 0)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=RUNS)
+    args = parser.parse_args()
+
+    samples = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, __file__, '--sample'], cwd=APP_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result['process'] = time.perf_counter() - started
+        samples.append(result)
+
+    print(f'{args.runs} runs, median:')
+    for phase in PHASES + ['process']:
+        values = [s[phase] for s in samples if s[phase] is not None]
+        if not values:
+            continue
+        label = 'whole process' if phase == 'process' else phase
+        print(f'  {label:15} {statistics.median(values) * 1000:7.1f} ms')
+    print(f"  modules loaded  {samples[-1]['modules']}")
+    print(f"database opened during startup: {'yes' if any(s['db_created'] for s in samples) else 'no'}")
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['--sample']:
+        sample()
+    else:
+        main()
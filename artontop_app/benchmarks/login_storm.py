@@ -0,0 +1,131 @@
+"""
+Feed latency during a login storm.
+
+Starts the app on a temporary SQLite database with a threaded server, then
+measures /home latency on its own and while LOGIN_THREADS clients keep
+posting wrong passwords to /login (throttling is disabled so every attempt
+reaches the hasher).
+
+    python benchmarks/login_storm.py                      # hashing in the process pool
+    python benchmarks/login_storm.py --inline             # hashing on request threads
+    python benchmarks/login_storm.py --login-threads 128  # more clients than HASH_QUEUE_LIMIT
+"""
+import argparse
+import http.cookiejar
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+from werkzeug.serving import make_server
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from extensions import db
+from models import Publication, User
+from security import PASSWORD_HASH_METHOD, PasswordHasher, TokenBucketLimiter
+
+LOGIN_THREADS = 32
+FEED_REQUESTS = 100
+PUBLICATIONS = 200
+
+
+def seed(app):
+    with app.app_context():
+        db.create_all()
+        pwhash = generate_password_hash('secret', method=PASSWORD_HASH_METHOD)
+        user = User(username='bench', email='bench@example.com', password=pwhash)
+        db.session.add(user)
+        db.session.commit()
+        for i in range(PUBLICATIONS):
+            db.session.add(Publication(
+                image=f'{i}.png', title=f'Pub {i}', hashtags=f'#tag{i % 7},#bench',
+                pub_type='Drawing', author_id=user.id))
+        db.session.commit()
+
+
+def logged_in_opener(base_url):
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    data = urllib.parse.urlencode({'email': 'bench@example.com', 'password': 'secret'}).encode()
+    opener.open(base_url + '/login', data=data).read()
+    return opener
+
+
+def measure_feed(opener, base_url):
+    latencies = []
+    for _ in range(FEED_REQUESTS):
+        started = time.perf_counter()
+        opener.open(base_url + '/home').read()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        'p50': statistics.median(latencies),
+        'p95': latencies[int(len(latencies) * 0.95) - 1],
+        'max': latencies[-1],
+    }
+
+
+def login_storm(base_url, stop, results):
+    data = urllib.parse.urlencode({'email': 'bench@example.com', 'password': 'wrong'}).encode()
+    while not stop.is_set():
+        try:
+            with urllib.request.urlopen(base_url + '/login', data=data) as response:
+                response.read()
+                results[response.status] += 1
+        except urllib.error.HTTPError as e:
+            results[e.code] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--inline', action='store_true', help='hash on request threads (no process pool)')
+    parser.add_argument('--login-threads', type=int, default=LOGIN_THREADS, help='concurrent login clients')
+    args = parser.parse_args()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')})
+    if args.inline:
+        app.extensions['password_hasher'] = PasswordHasher(workers=0, queue_limit=10 ** 6)
+    app.extensions['login_ip_limiter'] = TokenBucketLimiter(rate=10 ** 9, capacity=10 ** 9)
+    app.extensions['login_email_limiter'] = TokenBucketLimiter(rate=10 ** 9, capacity=10 ** 9)
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    seed(app)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    opener = logged_in_opener(base_url)  # also warms up the hashing pool
+    quiet = measure_feed(opener, base_url)
+
+    stop = threading.Event()
+    results = Counter()
+    storm = [threading.Thread(target=login_storm, args=(base_url, stop, results)) for _ in range(args.login_threads)]
+    for t in storm:
+        t.start()
+    time.sleep(1)
+    started = time.perf_counter()
+    loaded = measure_feed(opener, base_url)
+    storm_seconds = time.perf_counter() - started
+    stop.set()
+    for t in storm:
+        t.join()
+    server.shutdown()
+
+    print(f"hashing: {'inline' if args.inline else 'process pool'}, login threads: {args.login_threads}")
+    print(f"/home quiet        p50 {quiet['p50']:7.1f} ms  p95 {quiet['p95']:7.1f} ms  max {quiet['max']:7.1f} ms")
+    print(f"/home login storm  p50 {loaded['p50']:7.1f} ms  p95 {loaded['p95']:7.1f} ms  max {loaded['max']:7.1f} ms")
+    print(f"login responses during storm ({storm_seconds:.1f} s): "
+          + ', '.join(f'{code}: {count}' for code, count in sorted(results.items())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+# Разделы сайта; каждый модуль экспортирует blueprint `bp` и импортируется
+# только при регистрации в create_app (см. BLUEPRINTS в app.py)
@@ -0,0 +1,88 @@
+from flask import Blueprint, render_template, request, redirect, url_for, session
+
+from extensions import db, get_login_email_limiter, get_login_ip_limiter, get_password_hasher
+from models import User
+from security import HashingBusy
+
+bp = Blueprint('auth', __name__)
+
+def throttle_response(retry_after):
+    return "Error: Too many attempts, try again later", 429, {'Retry-After': str(int(retry_after) + 1)}
+
+def busy_response():
+    return "Error: Server is busy, try again later", 503, {'Retry-After': '5'}
+
+@bp.route('/')
+def index(): return render_template('index.html')
+
+@bp.route('/auth')
+def auth(): return render_template('auth.html')
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if request.method == 'POST':
+        allowed, retry_after = get_login_ip_limiter().consume(request.remote_addr)
+        if not allowed:
+            return throttle_response(retry_after)
+
+        email = request.form['email']
+        if User.query.filter_by(email=email).first():
+            return "Email exists!"
+        # Пока пароль хешируется, соединение с БД возвращаем в пул
+        db.session.rollback()
+        try:
+            hashed_pw = get_password_hasher().hash(request.form['password'])
+        except HashingBusy:
+            return busy_response()
+        new_user = User(
+            username=request.form['name'],
+            email=email,
+            password=hashed_pw,
+            avatar='default_avatar.svg'
+        )
+        db.session.add(new_user)
+        db.session.commit()
+        return redirect(url_for('auth.login'))
+    return render_template('register.html')
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        email = request.form.get('email')
+        password = request.form.get('password')
+
+        # Ограничиваем частоту попыток и с одного IP, и в один аккаунт
+        for limiter, key in ((get_login_ip_limiter(), request.remote_addr),
+                             (get_login_email_limiter(), (email or '').strip().lower())):
+            allowed, retry_after = limiter.consume(key)
+            if not allowed:
+                return throttle_response(retry_after)
+
+        user = User.query.filter_by(email=email).first()
+        if not user or not password:
+            return "Error: Wrong credentials"
+
+        # Пока пароль проверяется в пуле, соединение с БД возвращаем в пул
+        user_id, pwhash = user.id, user.password
+        db.session.rollback()
+
+        password_hasher = get_password_hasher()
+        try:
+            if not password_hasher.verify(pwhash, password):
+                return "Error: Wrong credentials"
+        except HashingBusy:
+            return busy_response()
+
+        # Пароль верный: заодно перехешируем его, если параметры хеша устарели
+        if password_hasher.needs_rehash(pwhash):
+            try:
+                new_hash = password_hasher.hash(password)
+                User.query.filter_by(id=user_id).update({'password': new_hash})
+                db.session.commit()
+            except HashingBusy:
+                pass  # перехешируем при следующем входе
+
+        session['user_id'] = user_id
+        return redirect(url_for('feed.home'))
+
+    return render_template('login.html')
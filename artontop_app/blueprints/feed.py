@@ -0,0 +1,68 @@
+from collections import Counter
+from flask import Blueprint, render_template, request, redirect, url_for, session
+
+from extensions import db
+from models import Publication, Subscription
+
+bp = Blueprint('feed', __name__)
+
+@bp.route('/home')
+def home():
+    if 'user_id' not in session:
+        return redirect(url_for('auth.auth'))
+
+    current_user_id = session['user_id']
+    active_type = request.args.get('pub_type', 'Все типы')
+    search_query = request.args.get('search')
+    page = request.args.get('page', 1, type=int)
+
+    query = Publication.query
+    if active_type != 'Все типы':
+        query = query.filter_by(pub_type=active_type)
+
+    if search_query is not None:
+        if search_query.strip() and search_query != 'Все':
+            query = query.filter(Publication.hashtags.contains(search_query))
+
+        pagination = query.order_by(Publication.id.desc()).paginate(page=page, per_page=30, error_out=False)
+
+        return render_template('home.html',
+                               mode='grid',
+                               pubs=pagination.items,
+                               search_query=search_query,
+                               active_type=active_type,
+                               next_page=page+1 if pagination.has_next else None)
+
+    # Получаем подписки текущего пользователя
+    following_ids = sorted(row[0] for row in db.session.query(Subscription.following_id).filter_by(
+        follower_id=current_user_id
+    ).all())
+
+    # Ряды ленты рендерятся из кэша фрагментов; данные загружаются только при промахе
+    def load_subscribed_pubs():
+        # Публикации от тех, на кого подписан пользователь
+        if not following_ids:
+            return []
+        return Publication.query.filter(
+            Publication.author_id.in_(following_ids)
+        ).order_by(Publication.created_at.desc()).limit(20).all()
+
+    def load_feed():
+        all_pubs = query.order_by(Publication.id.desc()).all()
+
+        all_tags = []
+        for p in all_pubs:
+            if p.hashtags:
+                tags = [t.strip().replace('#', '') for t in p.hashtags.replace(' ', ',').split(',') if t.strip()]
+                all_tags.extend(tags)
+
+        top_tags = [tag for tag, count in Counter(all_tags).most_common(5)]
+        return {'all_pubs': all_pubs, 'top_tags': top_tags}
+
+    return render_template('home.html',
+                           mode='feed',
+                           following_ids=tuple(following_ids),
+                           load_subscribed_pubs=load_subscribed_pubs,
+                           load_feed=load_feed,
+                           active_type=active_type,
+                           search_query=None)
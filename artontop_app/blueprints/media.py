@@ -0,0 +1,26 @@
+from flask import Blueprint, abort, redirect
+
+from extensions import get_storage
+
+bp = Blueprint('media', __name__)
+
+# Постоянный адрес загруженного файла: отдает не сам файл, а перенаправление
+# на хранилище (подписанную ссылку S3 или статический файл), так что байты
+# изображения идут в браузер мимо воркеров Flask
+@bp.route('/media/<path:key>')
+def download(key):
+    storage = get_storage()
+    try:
+        url = storage.url(key)
+    except ValueError:
+        abort(404)
+
+    response = redirect(url)
+    if storage.signed_urls:
+        # Браузер переиспользует перенаправление, пока подписанная ссылка заведомо действует
+        response.cache_control.private = True
+        response.cache_control.max_age = storage.url_expires // 2
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = 86400
+    return response
@@ -0,0 +1,204 @@
+import re
+from flask import Blueprint, Response, current_app, render_template, request, redirect, url_for, session, jsonify
+from werkzeug.utils import secure_filename
+
+from events import format_sse
+from extensions import db, get_broker
+from helpers import (build_post_payloads, bump_content_version, fast_jsonify, post_channel,
+                     publish_post_event, remove_upload, save_upload, user_scope)
+from models import Publication, PublicationComment, PublicationLike, User
+from rating import adjust_counters, on_like, on_publication_deleted
+
+bp = Blueprint('posts', __name__)
+
+@bp.route('/publish', methods=['GET', 'POST'])
+def create_pub():
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+
+    if request.method == 'POST':
+        file = request.files['image']
+        if file:
+            filename = secure_filename(file.filename)
+            save_upload(filename, file.stream, file.mimetype)
+
+            new_pub = Publication(
+                image=filename,
+                description=request.form['description'],
+                hashtags=request.form['hashtags'],
+                pub_type=request.form['pub_type'],
+                author_id=session['user_id'],
+                title=request.form['title']
+            )
+            db.session.add(new_pub)
+            adjust_counters(new_pub.author_id, publications=1)
+            db.session.commit()
+            bump_content_version('feed', user_scope(new_pub.author_id))
+            return redirect(url_for('feed.home'))
+
+    return render_template('create_pub.html', pub=None)
+
+@bp.route('/delete/<int:id>')
+def delete_pub(id):
+    pub = Publication.query.get(id)
+    if pub and pub.author_id == session.get('user_id'):
+        filenames = [pub.image] + [r.image for r in pub.remixes]
+        # Вместе с публикацией пропадают ее лайки и ремиксы: рейтинг авторов уменьшается в той же транзакции
+        on_publication_deleted(pub)
+        # Ремиксы, лайки и комментарии удаляются каскадом
+        db.session.delete(pub)
+        db.session.commit()
+        bump_content_version('feed', user_scope(session['user_id']))
+        for filename in filenames:
+            remove_upload(filename)
+    return redirect(url_for('feed.home'))
+
+@bp.route('/get_post/<int:id>')
+def get_post(id):
+    pub = Publication.query.get_or_404(id)
+    payload = build_post_payloads([pub], session.get('user_id'))[0]
+    return fast_jsonify(payload)
+
+@bp.route('/posts')
+def get_posts():
+    # Пакетные превью: /posts?ids=1,2,3&fields=id,title,image
+    limit = current_app.config['PREVIEW_BATCH_LIMIT']
+    ids = {}  # dict сохраняет порядок и убирает повторы
+    for raw in request.args.get('ids', '').split(','):
+        # Только ASCII-цифры: isdigit() пропускает '²', на котором падает int()
+        raw = raw.strip()
+        if re.fullmatch(r'[0-9]+', raw):
+            ids[int(raw)] = None
+            if len(ids) >= limit:
+                break
+    ids = list(ids)
+
+    fields = None
+    if request.args.get('fields'):
+        fields = {f.strip() for f in request.args['fields'].split(',')} & current_app.config['PREVIEW_FIELDS']
+        fields.add('id')
+
+    if not ids:
+        return fast_jsonify({'posts': []})
+
+    pubs_by_id = {p.id: p for p in Publication.query.filter(Publication.id.in_(ids)).all()}
+    pubs = [pubs_by_id[i] for i in ids if i in pubs_by_id]
+    return fast_jsonify({'posts': build_post_payloads(pubs, session.get('user_id'), fields)})
+
+@bp.route('/edit/<int:id>', methods=['POST'])
+def edit_pub(id):
+    pub = Publication.query.get_or_404(id)
+    if pub.author_id != session.get('user_id'):
+        return "Access Denied", 403
+
+    pub.description = request.form.get('description')
+    pub.hashtags = request.form.get('hashtags')
+    pub.pub_type = request.form.get('pub_type')
+    db.session.commit()
+    bump_content_version('feed', user_scope(pub.author_id))
+    return redirect(url_for('feed.home'))
+
+# [НОВОЕ] Добавление комментария к ОРИГИНАЛУ
+@bp.route('/add_pub_comment', methods=['POST'])
+def add_pub_comment():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    data = request.json
+    text = data.get('text')
+    pub_id = data.get('pub_id')
+
+    if not text or not pub_id:
+        return jsonify({'error': 'Missing data'}), 400
+
+    comment = PublicationComment(
+        pub_id=pub_id,
+        author_id=session['user_id'],
+        text=text
+    )
+    db.session.add(comment)
+    db.session.commit()
+
+    author = User.query.get(session['user_id'])
+    date = comment.created_at.strftime('%d.%m.%Y %H:%M')
+    publish_post_event(pub_id, 'comment', {
+        'target': 'pub',
+        'id': pub_id,
+        'author': author.username,
+        'author_id': author.id,
+        'text': text,
+        'date': date
+    })
+    return jsonify({
+        'status': 'success',
+        'author': author.username,
+        'text': text,
+        'date': date
+    })
+
+# [НОВОЕ] Получение комментариев ОРИГИНАЛА
+@bp.route('/get_pub_comments/<int:pub_id>')
+def get_pub_comments(pub_id):
+    comments = PublicationComment.query.filter_by(pub_id=pub_id).order_by(PublicationComment.created_at.asc()).all()
+    result = []
+    for c in comments:
+        result.append({
+            'author': c.author.username,
+            'author_id': c.author.id,
+            'text': c.text,
+            'date': c.created_at.strftime('%d.%m.%Y %H:%M')
+        })
+    return jsonify({'comments': result})
+
+# Поток событий открытой публикации (лайки, комментарии, новые ремиксы)
+@bp.route('/events/post/<int:pub_id>')
+def post_events(pub_id):
+    sub = get_broker().subscribe(post_channel(pub_id))
+    # Генератор работает вне контекста запроса, настройку читаем заранее
+    heartbeat = current_app.config['SSE_HEARTBEAT']
+
+    def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                message = sub.get(timeout=heartbeat)
+                if message is None:
+                    # Пинг держит соединение открытым и выявляет отключившихся клиентов
+                    yield ': ping\n\n'
+                    continue
+                event, data = message
+                yield format_sse(event, data)
+        finally:
+            sub.close()
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@bp.route('/toggle_pub_like/<int:pub_id>', methods=['POST'])
+def toggle_pub_like(pub_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    user_id = session['user_id']
+    pub = Publication.query.get_or_404(pub_id)
+    existing_like = PublicationLike.query.filter_by(pub_id=pub_id, user_id=user_id).first()
+
+    if existing_like:
+        # Убираем лайк
+        db.session.delete(existing_like)
+        liked = False
+    else:
+        # Ставим лайк
+        new_like = PublicationLike(pub_id=pub_id, user_id=user_id)
+        db.session.add(new_like)
+        liked = True
+    # Рейтинг автора меняется в той же транзакции, что и лайк
+    on_like(pub.author_id, user_id, liked)
+    db.session.commit()
+
+    # Подсчитываем общее количество лайков
+    like_count = PublicationLike.query.filter_by(pub_id=pub_id).count()
+    publish_post_event(pub_id, 'like', {'target': 'pub', 'id': pub_id, 'like_count': like_count})
+
+    return jsonify({'liked': liked, 'like_count': like_count})
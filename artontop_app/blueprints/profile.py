@@ -0,0 +1,100 @@
+import time
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, session, flash, jsonify
+from werkzeug.utils import secure_filename
+
+from extensions import db
+from helpers import bump_content_version, remove_upload, save_upload, user_scope
+from models import Publication, Subscription, User
+
+bp = Blueprint('profile', __name__)
+
+@bp.route('/profile/<int:user_id>')
+def profile(user_id):
+    if 'user_id' not in session:
+        return redirect(url_for('auth.auth'))
+
+    # Получаем информацию о пользователе
+    user = User.query.get_or_404(user_id)
+    current_user_id = session['user_id']
+    is_own_profile = (current_user_id == user_id)
+
+    # Проверяем, подписан ли текущий пользователь на этого пользователя
+    is_subscribed = False
+    if not is_own_profile:
+        is_subscribed = Subscription.query.filter_by(
+            follower_id=current_user_id,
+            following_id=user_id
+        ).first() is not None
+
+    # Получаем фильтр по типу (если есть)
+    pub_type_filter = request.args.get('pub_type', 'Все типы')
+
+    # Получаем публикации пользователя
+    query = Publication.query.filter_by(author_id=user_id)
+
+    if pub_type_filter != 'Все типы':
+        query = query.filter_by(pub_type=pub_type_filter)
+
+    # Сетка публикаций берется из кэша фрагментов, список загружается только при промахе
+    def load_publications():
+        # Сортировка: закрепленные вверху, затем по дате (новые первые)
+        return query.order_by(Publication.pinned.desc(), Publication.created_at.desc()).all()
+
+    # Рейтинг и счетчики хранятся в User (rating.py): профиль не выполняет агрегатных запросов
+    return render_template('profile.html',
+                         user=user,
+                         publications_count=user.publications_count,
+                         load_publications=load_publications,
+                         is_own_profile=is_own_profile,
+                         is_subscribed=is_subscribed,
+                         active_type=pub_type_filter,
+                         content_types=current_app.config['CONTENT_TYPES'])
+
+@bp.route('/profile/edit', methods=['GET', 'POST'])
+def edit_profile():
+    if 'user_id' not in session:
+        return redirect(url_for('auth.auth'))
+
+    user = User.query.get_or_404(session['user_id'])
+
+    if request.method == 'POST':
+        user.username = request.form.get('username', user.username)
+        user.bio = request.form.get('bio', user.bio)
+
+        # Обработка аватарки
+        old_avatar = user.avatar
+        if 'avatar' in request.files:
+            file = request.files['avatar']
+            if file and file.filename:
+                filename = secure_filename(file.filename)
+                timestamp = str(int(time.time()))
+                filename = f"avatar_{user.id}_{timestamp}_{filename}"
+                save_upload(filename, file.stream, file.mimetype)
+                user.avatar = filename
+
+        db.session.commit()
+        if user.avatar != old_avatar:
+            remove_upload(old_avatar)
+        flash('Профиль успешно обновлен!', 'success')
+        return redirect(url_for('profile.profile', user_id=user.id))
+
+    return render_template('edit_profile.html', user=user)
+
+@bp.route('/pin_post/<int:post_id>', methods=['POST'])
+def pin_post(post_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not authorized'}), 401
+
+    user_id = session['user_id']
+    post = Publication.query.get_or_404(post_id)
+
+    # Проверяем, что это публикация текущего пользователя
+    if post.author_id != user_id:
+        return jsonify({'error': 'Not your post'}), 403
+
+    # Переключаем статус закрепления
+    post.pinned = not post.pinned
+    db.session.commit()
+    bump_content_version(user_scope(user_id))
+
+    return jsonify({'success': True, 'pinned': post.pinned})
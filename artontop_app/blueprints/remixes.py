@@ -0,0 +1,196 @@
+import io
+import time
+import base64
+from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify
+
+from drafts import (DRAFT_MAX_BATCH_OPS, MAX_STROKE_POINTS, DraftConflict, DraftFull, append_ops, discard_draft,
+                    draft_state, get_draft)
+from extensions import db
+from helpers import fast_jsonify, publish_post_event, remove_upload, save_upload
+from models import Publication, Remix, RemixComment, RemixLike, User
+from rating import on_like, on_remix, on_remix_deleted
+
+bp = Blueprint('remixes', __name__)
+
+@bp.route('/editor/<int:original_id>')
+def editor(original_id):
+    if 'user_id' not in session:
+        return redirect(url_for('auth.login'))
+    pub = Publication.query.get_or_404(original_id)
+    return render_template('editor.html', pub=pub,
+                           max_stroke_points=MAX_STROKE_POINTS, draft_batch_ops=DRAFT_MAX_BATCH_OPS)
+
+@bp.route('/save_remix', methods=['POST'])
+def save_remix():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    data = request.json
+    image_data = data['image']
+    original_id = data['original_id']
+
+    try:
+        header, encoded = image_data.split(",", 1)
+        file_data = base64.b64decode(encoded)
+
+        filename = f"remix_{original_id}_{int(time.time())}.png"
+        save_upload(filename, io.BytesIO(file_data), 'image/png')
+
+        new_remix = Remix(
+            image=filename,
+            original_pub_id=original_id,
+            author_id=session['user_id']
+        )
+        db.session.add(new_remix)
+        original = Publication.query.get(original_id)
+        if original:
+            on_remix(original.author_id, new_remix.author_id)
+        # Черновик становится ремиксом: удаляется в той же транзакции
+        discard_draft(session['user_id'], original_id)
+        db.session.commit()
+
+        publish_post_event(new_remix.original_pub_id, 'remix', {
+            'id': new_remix.id,
+            'image': new_remix.image,
+            'author_name': new_remix.author.username,
+            'author_id': new_remix.author_id,
+            'date': new_remix.created_at.strftime('%d.%m.%Y'),
+            'like_count': 0,
+            'user_liked': False,
+            'is_subscribed': False
+        })
+        return jsonify({'status': 'success', 'remix_id': new_remix.id})
+    except Exception as e:
+        print(e)
+        return jsonify({'error': 'Failed to save'}), 500
+
+# Автосохранение редактора: операции кистью вместо снимков холста (см. drafts.py)
+@bp.route('/drafts/<int:pub_id>', methods=['GET', 'POST', 'DELETE'])
+def draft(pub_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    user_id = session['user_id']
+    Publication.query.get_or_404(pub_id)
+
+    if request.method == 'GET':
+        return fast_jsonify(draft_state(get_draft(user_id, pub_id)))
+
+    if request.method == 'DELETE':
+        discard_draft(user_id, pub_id)
+        db.session.commit()
+        return jsonify({'status': 'success'})
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    base = data.get('base')
+    if type(base) is not int:
+        return jsonify({'error': 'Missing base revision'}), 400
+
+    try:
+        revision = append_ops(user_id, pub_id, base, data.get('ops'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except DraftConflict as e:
+        # Клиент перечитывает черновик и досылает только то, чего нет на сервере
+        return jsonify({'error': 'Draft changed', 'revision': e.revision}), 409
+    except DraftFull:
+        return jsonify({'error': 'Draft is too long, publish or discard it'}), 413
+    return jsonify({'revision': revision})
+
+@bp.route('/delete_remix/<int:id>', methods=['POST'])
+def delete_remix(id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    remix = Remix.query.get_or_404(id)
+    if remix.author_id != session['user_id']:
+        return jsonify({'error': 'Access Denied'}), 403
+
+    filename = remix.image
+    # Рейтинг авторов уменьшается в той же транзакции, что и удаление
+    on_remix_deleted(remix)
+    db.session.delete(remix)
+    db.session.commit()
+    remove_upload(filename)
+    return jsonify({'status': 'success'})
+
+@bp.route('/add_remix_comment', methods=['POST'])
+def add_remix_comment():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    data = request.json
+    text = data.get('text')
+    remix_id = data.get('remix_id')
+
+    if not text or not remix_id:
+        return jsonify({'error': 'Missing data'}), 400
+
+    remix = Remix.query.get_or_404(remix_id)
+    comment = RemixComment(
+        remix_id=remix.id,
+        author_id=session['user_id'],
+        text=text
+    )
+    db.session.add(comment)
+    db.session.commit()
+
+    author = User.query.get(session['user_id'])
+    date = comment.created_at.strftime('%d.%m.%Y %H:%M')
+    publish_post_event(remix.original_pub_id, 'comment', {
+        'target': 'remix',
+        'id': remix.id,
+        'author': author.username,
+        'author_id': author.id,
+        'text': text,
+        'date': date
+    })
+    return jsonify({
+        'status': 'success',
+        'author': author.username,
+        'text': text,
+        'date': date
+    })
+
+@bp.route('/get_remix_comments/<int:remix_id>')
+def get_remix_comments(remix_id):
+    comments = RemixComment.query.filter_by(remix_id=remix_id).order_by(RemixComment.created_at.asc()).all()
+    result = []
+    for c in comments:
+        result.append({
+            'author': c.author.username,
+            'author_id': c.author.id,
+            'text': c.text,
+            'date': c.created_at.strftime('%d.%m.%Y %H:%M')
+        })
+    return jsonify({'comments': result})
+
+@bp.route('/toggle_remix_like/<int:remix_id>', methods=['POST'])
+def toggle_remix_like(remix_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    user_id = session['user_id']
+    remix = Remix.query.get_or_404(remix_id)
+    existing_like = RemixLike.query.filter_by(remix_id=remix_id, user_id=user_id).first()
+
+    if existing_like:
+        # Убираем лайк
+        db.session.delete(existing_like)
+        liked = False
+    else:
+        # Ставим лайк
+        new_like = RemixLike(remix_id=remix_id, user_id=user_id)
+        db.session.add(new_like)
+        liked = True
+    # Рейтинг автора меняется в той же транзакции, что и лайк
+    on_like(remix.author_id, user_id, liked)
+    db.session.commit()
+
+    # Подсчитываем общее количество лайков
+    like_count = RemixLike.query.filter_by(remix_id=remix_id).count()
+    publish_post_event(remix.original_pub_id, 'like', {'target': 'remix', 'id': remix_id, 'like_count': like_count})
+
+    return jsonify({'liked': liked, 'like_count': like_count})
@@ -0,0 +1,100 @@
+from flask import Blueprint, current_app, request, session, jsonify
+
+from extensions import db
+from helpers import fast_jsonify
+from models import Subscription, User, UserRecommendation
+from rating import leaderboard_page, on_subscription
+
+bp = Blueprint('social', __name__)
+
+@bp.route('/subscribe/<int:user_id>', methods=['POST'])
+def subscribe(user_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    current_user_id = session['user_id']
+
+    # Нельзя подписаться на самого себя
+    if current_user_id == user_id:
+        return jsonify({'error': 'Cannot subscribe to yourself'}), 400
+
+    # Проверяем существование пользователя
+    target_user = User.query.get_or_404(user_id)
+
+    # Проверяем, есть ли уже подписка
+    existing_sub = Subscription.query.filter_by(
+        follower_id=current_user_id,
+        following_id=user_id
+    ).first()
+
+    if existing_sub:
+        # Отписываемся
+        db.session.delete(existing_sub)
+        subscribed = False
+    else:
+        # Подписываемся
+        new_sub = Subscription(
+            follower_id=current_user_id,
+            following_id=user_id
+        )
+        db.session.add(new_sub)
+        subscribed = True
+    # Счетчик подписчиков и рейтинг меняются в той же транзакции, что и подписка
+    on_subscription(user_id, subscribed)
+    db.session.commit()
+
+    return jsonify({
+        'subscribed': subscribed,
+        'subscribers_count': target_user.subscribers_count
+    })
+
+@bp.route('/recommendations')
+def recommendations():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    current_user_id = session['user_id']
+    limit = max(1, min(request.args.get('limit', 10, type=int),
+                       current_app.config['RECOMMENDATIONS_TOP_N']))
+
+    # Только чтение готового топа; уже оформленные подписки отфильтровываем
+    already_following = db.session.query(Subscription.following_id).filter_by(follower_id=current_user_id)
+    rows = db.session.query(UserRecommendation.score, User).join(
+        User, User.id == UserRecommendation.recommended_id
+    ).filter(
+        UserRecommendation.user_id == current_user_id,
+        UserRecommendation.recommended_id.notin_(already_following)
+    ).order_by(UserRecommendation.score.desc()).limit(limit).all()
+
+    return fast_jsonify({'users': [{
+        'id': user.id,
+        'username': user.username,
+        'avatar': user.avatar,
+        'subscribers_count': user.subscribers_count,
+        'score': round(score, 2)
+    } for score, user in rows]})
+
+@bp.route('/leaderboard')
+def leaderboard():
+    # Страницы по ключу: /leaderboard?limit=20&after=<rating>:<id> (значение next из прошлого ответа)
+    limit = max(1, min(request.args.get('limit', 20, type=int),
+                       current_app.config['LEADERBOARD_PAGE_SIZE']))
+    after = None
+    if request.args.get('after'):
+        try:
+            rating, user_id = request.args['after'].split(':')
+            after = (int(rating), int(user_id))
+        except ValueError:
+            return jsonify({'error': 'Bad cursor'}), 400
+
+    users, next_key = leaderboard_page(limit, after)
+    return fast_jsonify({
+        'users': [{
+            'id': user.id,
+            'username': user.username,
+            'avatar': user.avatar,
+            'rating': user.rating,
+            'subscribers_count': user.subscribers_count
+        } for user in users],
+        'next': f'{next_key[0]}:{next_key[1]}' if next_key else None
+    })
@@ -0,0 +1,151 @@
+"""
+Сборка мусора: строки без родителя, файлы хранилища без ссылок и свободные страницы SQLite.
+Запуск (cron, раз в сутки): flask --app app collect-garbage [--dry-run] [--full-vacuum]
+"""
+import time
+
+from sqlalchemy import delete, exists, func, select, text
+
+from extensions import db, get_storage
+from helpers import GLOBAL_SCOPE, bump_content_version
+from models import (Publication, PublicationComment, PublicationLike, Remix, RemixComment, RemixDraft,
+                    RemixDraftChunk, RemixLike, Subscription, User, UserRecommendation)
+
+BATCH_SIZE = 500  # rows per transaction, so the site keeps working during a run
+FILE_GRACE_SECONDS = 3600  # a fresh upload may not have its row committed yet
+VACUUM_PAGES = 2000  # pages released per incremental vacuum step
+DEFAULT_AVATAR = 'default_avatar.svg'
+
+# (model, [(foreign key column, parent model), ...]); parents come before children,
+# so rows orphaned by an earlier step are collected in the same run
+ORPHAN_RULES = [
+    (Publication, [(Publication.author_id, User)]),
+    (Remix, [(Remix.original_pub_id, Publication), (Remix.author_id, User)]),
+    (RemixLike, [(RemixLike.remix_id, Remix), (RemixLike.user_id, User)]),
+    (RemixComment, [(RemixComment.remix_id, Remix), (RemixComment.author_id, User)]),
+    (PublicationLike, [(PublicationLike.pub_id, Publication), (PublicationLike.user_id, User)]),
+    (PublicationComment, [(PublicationComment.pub_id, Publication), (PublicationComment.author_id, User)]),
+    (RemixDraft, [(RemixDraft.original_pub_id, Publication), (RemixDraft.author_id, User)]),
+    (RemixDraftChunk, [(RemixDraftChunk.draft_id, RemixDraft)]),
+    (Subscription, [(Subscription.follower_id, User), (Subscription.following_id, User)]),
+    (UserRecommendation, [(UserRecommendation.user_id, User), (UserRecommendation.recommended_id, User)]),
+]
+
+
+def collect_garbage(dry_run=False, full_vacuum=False, log=print):
+    report = {'rows': {}, 'files': 0, 'file_bytes': 0, 'db_bytes': 0}
+
+    for model, parents in ORPHAN_RULES:
+        count = _collect_orphans(model, parents, dry_run)
+        report['rows'][model.__tablename__] = count
+        log(f'{model.__tablename__}: {count} orphaned rows')
+
+    report['files'], report['file_bytes'] = _collect_files(dry_run)
+    log(f"uploads: {report['files']} files, {_format_bytes(report['file_bytes'])}")
+
+    if not dry_run:
+        if any(report['rows'].values()):
+            # Removed rows may still be in the fragment caches of running workers
+            bump_content_version(GLOBAL_SCOPE)
+        report['db_bytes'] = _vacuum(full_vacuum, log)
+        log(f"database: {_format_bytes(report['db_bytes'])} reclaimed")
+    return report
+
+
+def _orphan_condition(parents):
+    conditions = []
+    for column, parent in parents:
+        conditions.append(column.isnot(None) & ~exists().where(parent.id == column))
+    condition = conditions[0]
+    for other in conditions[1:]:
+        condition = condition | other
+    return condition
+
+
+def _collect_orphans(model, parents, dry_run):
+    condition = _orphan_condition(parents)
+    if dry_run:
+        return db.session.scalar(select(func.count()).select_from(model).where(condition))
+
+    total = 0
+    while True:
+        ids = db.session.scalars(select(model.id).where(condition).limit(BATCH_SIZE)).all()
+        if not ids:
+            return total
+        db.session.execute(delete(model).where(model.id.in_(ids)))
+        db.session.commit()
+        total += len(ids)
+
+
+def _collect_files(dry_run):
+    storage = get_storage()
+    cutoff = time.time() - FILE_GRACE_SECONDS
+    files = bytes_freed = 0
+
+    batch = []
+    for name, size, mtime in storage.iter_files():
+        if name == DEFAULT_AVATAR or mtime > cutoff:
+            continue
+        batch.append((name, size))
+        if len(batch) >= BATCH_SIZE:
+            freed = _remove_unreferenced(storage, batch, dry_run)
+            files, bytes_freed = files + freed[0], bytes_freed + freed[1]
+            batch = []
+    if batch:
+        freed = _remove_unreferenced(storage, batch, dry_run)
+        files, bytes_freed = files + freed[0], bytes_freed + freed[1]
+    return files, bytes_freed
+
+
+def _remove_unreferenced(storage, batch, dry_run):
+    names = [name for name, _ in batch]
+    referenced = set(db.session.scalars(select(Publication.image).where(Publication.image.in_(names))))
+    referenced |= set(db.session.scalars(select(Remix.image).where(Remix.image.in_(names))))
+    referenced |= set(db.session.scalars(select(User.avatar).where(User.avatar.in_(names))))
+    db.session.rollback()
+
+    files = bytes_freed = 0
+    for name, size in batch:
+        if name in referenced:
+            continue
+        if not dry_run:
+            storage.delete(name)
+        files += 1
+        bytes_freed += size
+    return files, bytes_freed
+
+
+def _vacuum(full_vacuum, log):
+    """Release free pages back to the filesystem; returns bytes reclaimed."""
+    if db.engine.dialect.name != 'sqlite':
+        return 0
+
+    # VACUUM can't run inside a transaction
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        page_size = conn.execute(text('PRAGMA page_size')).scalar()
+        page_count = conn.execute(text('PRAGMA page_count')).scalar()
+        auto_vacuum = conn.execute(text('PRAGMA auto_vacuum')).scalar()
+
+        if full_vacuum:
+            # One-off: switch to incremental mode (takes effect after VACUUM) and rebuild the file
+            conn.execute(text('PRAGMA auto_vacuum = INCREMENTAL'))
+            conn.execute(text('VACUUM'))
+        elif auto_vacuum == 2:
+            while conn.execute(text('PRAGMA freelist_count')).scalar() > 0:
+                # The pragma frees pages while its result is being stepped through
+                conn.execute(text(f'PRAGMA incremental_vacuum({VACUUM_PAGES})')).fetchall()
+        else:
+            free = conn.execute(text('PRAGMA freelist_count')).scalar()
+            log(f'database: {_format_bytes(free * page_size)} free, '
+                f'run with --full-vacuum once to enable incremental vacuum')
+            return 0
+
+        # Switching modes adds pointer-map pages, so the file may even grow slightly
+        return max(0, page_count - conn.execute(text('PRAGMA page_count')).scalar()) * page_size
+
+
+def _format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f'{size:.1f} {unit}' if unit != 'B' else f'{size} B'
+        size /= 1024
@@ -0,0 +1,66 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+# Команды flask --app app ...; тяжелые модули импортируются только при запуске команды
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Создать недостающие таблицы (существующие не изменяются)."""
+    from extensions import db
+    import models  # noqa: F401 - регистрирует модели в metadata
+    db.create_all()
+    click.echo(f"Схема создана: {current_app.config['SQLALCHEMY_DATABASE_URI']}")
+
+@click.command('build-recommendations')
+@with_appcontext
+@click.option('--full', is_flag=True, help='Пересчитать всех пользователей, а не только затронутых новыми связями.')
+def build_recommendations_command(full):
+    from recommendations import build_recommendations
+    stats = build_recommendations(top_n=current_app.config['RECOMMENDATIONS_TOP_N'], full=full)
+    click.echo(f"Пересчитано пользователей: {stats['users']}, рекомендаций: {stats['rows']}, "
+               f"за {stats['seconds']:.1f} с ({'полный' if stats['full'] else 'инкрементальный'} расчет)")
+
+@click.command('export-data')
+@with_appcontext
+@click.argument('directory', type=click.Path(file_okay=False))
+def export_data_command(directory):
+    """Выгрузить данные (NDJSON) и медиафайлы (tar) в DIRECTORY."""
+    from transfer import export_data
+    export_data(directory, log=click.echo)
+
+@click.command('import-data')
+@with_appcontext
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+def import_data_command(directory):
+    """Загрузить выгрузку из DIRECTORY (id пересчитываются, email объединяются)."""
+    from transfer import import_data
+    import_data(directory, log=click.echo)
+
+@click.command('collect-garbage')
+@with_appcontext
+@click.option('--dry-run', is_flag=True, help='Только посчитать, ничего не удалять.')
+@click.option('--full-vacuum', is_flag=True, help='Один раз перевести SQLite в режим incremental vacuum (полный VACUUM).')
+def collect_garbage_command(dry_run, full_vacuum):
+    """Удалить осиротевшие записи и неиспользуемые файлы загрузок."""
+    from cleanup import collect_garbage
+    collect_garbage(dry_run=dry_run, full_vacuum=full_vacuum, log=click.echo)
+
+@click.command('recompute-ratings')
+@with_appcontext
+def recompute_ratings_command():
+    """Пересчитать рейтинг и счетчики всех пользователей (исправляет расхождения)."""
+    from rating import recompute_ratings
+    stats = recompute_ratings()
+    click.echo(f"Проверено пользователей: {stats['users']}, исправлено: {stats['updated']}, "
+               f"за {stats['seconds']:.1f} с")
+
+COMMANDS = [
+    init_db_command,
+    build_recommendations_command,
+    export_data_command,
+    import_data_command,
+    collect_garbage_command,
+    recompute_ratings_command,
+]
@@ -0,0 +1,53 @@
+import os
+
+# Настройки по умолчанию; create_app загружает все имена в верхнем регистре
+# в app.config, отдельные значения можно переопределить аргументом create_app
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+SECRET_KEY = 'art_top_secret'
+
+# DB Config
+SQLALCHEMY_DATABASE_URI = os.environ.get(
+    'ARTONTOP_DATABASE_URI', 'sqlite:///' + os.path.join(basedir, 'database.db'))
+UPLOAD_FOLDER = os.path.join(basedir, 'static', 'uploads')
+# Хранилище загрузок: без бакета файлы лежат в UPLOAD_FOLDER, с бакетом -
+# в S3-совместимом хранилище (для MinIO задается адрес, например http://localhost:9000).
+# Ключи доступа можно не указывать: boto3 возьмет их из AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY
+STORAGE_BUCKET = os.environ.get('ARTONTOP_STORAGE_BUCKET')
+STORAGE_ENDPOINT_URL = os.environ.get('ARTONTOP_STORAGE_ENDPOINT')
+STORAGE_REGION = os.environ.get('ARTONTOP_STORAGE_REGION')
+STORAGE_ACCESS_KEY = os.environ.get('ARTONTOP_STORAGE_ACCESS_KEY')
+STORAGE_SECRET_KEY = os.environ.get('ARTONTOP_STORAGE_SECRET_KEY')
+STORAGE_PREFIX = os.environ.get('ARTONTOP_STORAGE_PREFIX', '')
+STORAGE_URL_EXPIRES = 3600  # секунд живет подписанная ссылка на скачивание
+# Брокер событий: без адреса работает в памяти процесса,
+# для нескольких воркеров задается адрес Redis (redis://localhost:6379/0)
+EVENT_BROKER_URL = os.environ.get('ARTONTOP_BROKER_URL')
+
+# --- КОНФИГУРАЦИЯ ТИПОВ ---
+CONTENT_TYPES = ["Drawing", "Tutorial", "Pose", "Gamma", "Character Design", "Other"]
+
+# --- КОНФИГУРАЦИЯ API ---
+PREVIEW_BATCH_LIMIT = 50  # максимум id в одном запросе /posts
+PREVIEW_FIELDS = {
+    'id', 'image', 'description', 'hashtags', 'pub_type', 'title',
+    'author_name', 'author_id', 'is_owner', 'current_user_id',
+    'remixes', 'like_count', 'user_liked', 'is_subscribed'
+}
+COMPRESS_MIN_SIZE = 500  # JSON меньше этого размера не сжимаем
+FRAGMENT_CACHE_SIZE = 512  # максимум закэшированных HTML-фрагментов
+FRAGMENT_CACHE_TTL = 60  # секунд живет фрагмент (версии в базе сбрасывают его раньше)
+SSE_HEARTBEAT = 15  # секунд между пингами открытого потока событий
+RECOMMENDATIONS_TOP_N = 20  # сколько рекомендаций хранить на пользователя
+LEADERBOARD_PAGE_SIZE = 50  # максимум авторов на странице рейтинга
+
+# --- КОНФИГУРАЦИЯ ВХОДА ---
+LOGIN_IP_CAPACITY = 20  # попыток входа/регистрации с одного IP подряд
+LOGIN_IP_RATE = 0.2  # восстановление: попыток в секунду
+LOGIN_EMAIL_CAPACITY = 5  # попыток входа в один аккаунт подряд
+LOGIN_EMAIL_RATE = 1 / 60
+# Сколько прокси (nginx) стоит перед приложением: адрес клиента для лимитов берется
+# из X-Forwarded-For. По умолчанию 0 (заголовку не доверяем, его может подделать клиент);
+# развертывание за nginx задает ARTONTOP_TRUSTED_PROXIES=1
+TRUSTED_PROXIES = int(os.environ.get('ARTONTOP_TRUSTED_PROXIES', '0'))
@@ -0,0 +1,216 @@
+"""
+Черновики редактора ремиксов: журнал операций (штрихи, отмена, повтор), который автосохранение
+дописывает порциями с проверкой ревизии; replay() восстанавливает холст, compact() сжимает журнал.
+"""
+import json
+import re
+from datetime import datetime
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import RemixDraft, RemixDraftChunk
+
+TOOLS = {'pen', 'pencil', 'felt', 'square', 'marker', 'eraser'}
+COLOR_RE = re.compile(r'^#[0-9a-fA-F]{6}$')
+MAX_BRUSH_SIZE = 50
+MAX_STROKE_POINTS = 5000
+MAX_COORDINATE = 10 ** 6  # tenths of a pixel
+DRAFT_MAX_BATCH_OPS = 500
+DRAFT_MAX_OPS = 20000  # stored operations per draft after compaction
+DRAFT_COMPACT_CHUNKS = 50
+
+
+class DraftConflict(Exception):
+    """The batch does not continue the stored draft."""
+
+    def __init__(self, revision):
+        super().__init__(revision)
+        self.revision = revision
+
+
+class DraftFull(Exception):
+    """The draft has reached DRAFT_MAX_OPS operations."""
+
+
+def clean_ops(ops):
+    """Validated copies of editor operations (unknown keys dropped); ValueError if malformed.
+
+    {"t": "stroke", "tool": "pen", "c": "#1a2b3c", "w": 5, "a": 1, "p": [x0, y0, dx1, dy1, ...]},
+    {"t": "undo"} or {"t": "redo"}; points are in tenths of a pixel, deltas after the first one.
+    """
+    if not isinstance(ops, list) or not ops:
+        raise ValueError('ops must be a non-empty list')
+    if len(ops) > DRAFT_MAX_BATCH_OPS:
+        raise ValueError(f'at most {DRAFT_MAX_BATCH_OPS} ops per batch')
+    cleaned = []
+    for op in ops:
+        if not isinstance(op, dict):
+            raise ValueError('op must be an object')
+        kind = op.get('t')
+        if kind in ('undo', 'redo'):
+            cleaned.append({'t': kind})
+            continue
+        if kind != 'stroke':
+            raise ValueError(f'unknown op: {kind!r}')
+        if op.get('tool') not in TOOLS:
+            raise ValueError('unknown tool')
+        if not isinstance(op.get('c'), str) or not COLOR_RE.match(op['c']):
+            raise ValueError('bad color')
+        if not _is_number(op.get('w')) or not 1 <= op['w'] <= MAX_BRUSH_SIZE:
+            raise ValueError('bad size')
+        if not _is_number(op.get('a')) or not 0 <= op['a'] <= 1:
+            raise ValueError('bad alpha')
+        points = op.get('p')
+        if (not isinstance(points, list) or not points or len(points) % 2
+                or len(points) > 2 * MAX_STROKE_POINTS):
+            raise ValueError('bad points')
+        if not all(type(v) is int and -MAX_COORDINATE <= v <= MAX_COORDINATE for v in points):
+            raise ValueError('points must be integers')
+        cleaned.append({'t': 'stroke', 'tool': op['tool'], 'c': op['c'], 'w': op['w'], 'a': op['a'], 'p': points})
+    return cleaned
+
+
+def replay(ops):
+    """Apply an operation log; returns (strokes, head)."""
+    strokes, head = [], 0
+    for op in ops:
+        kind = op['t']
+        if kind == 'stroke':
+            # A new stroke after undo drops the undone branch, as in the editor
+            del strokes[head:]
+            strokes.append(op)
+            head += 1
+        elif kind == 'undo':
+            head = max(0, head - 1)
+        elif kind == 'redo':
+            head = min(len(strokes), head + 1)
+    return strokes, head
+
+
+def get_draft(author_id, pub_id):
+    return RemixDraft.query.filter_by(author_id=author_id, original_pub_id=pub_id).first()
+
+
+def draft_state(draft):
+    if draft is None:
+        return {'revision': 0, 'strokes': [], 'head': 0}
+    strokes, head = replay(_load_ops(draft))
+    return {'revision': draft.revision, 'strokes': strokes, 'head': head}
+
+
+def append_ops(author_id, pub_id, base, ops):
+    """Store a batch that continues revision `base`; returns the new revision."""
+    ops = clean_ops(ops)
+    draft = get_draft(author_id, pub_id)
+    revision = draft.revision if draft else 0
+    if base != revision:
+        raise DraftConflict(revision)
+
+    if draft is None:
+        draft = RemixDraft(author_id=author_id, original_pub_id=pub_id)
+        db.session.add(draft)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            # Another request created the draft first
+            db.session.rollback()
+            draft = get_draft(author_id, pub_id)
+            raise DraftConflict(draft.revision if draft else 0)
+    elif draft.op_count + len(ops) > DRAFT_MAX_OPS:
+        # Compaction drops undone branches and undo/redo pairs, often enough to fit the batch
+        compact(draft.id)
+        db.session.refresh(draft)
+        if draft.revision != base:
+            raise DraftConflict(draft.revision)
+        if draft.op_count + len(ops) > DRAFT_MAX_OPS:
+            raise DraftFull()
+
+    # The revision check and the bump are one statement, so concurrent batches can't both pass
+    result = db.session.execute(
+        update(RemixDraft)
+        .where(RemixDraft.id == draft.id, RemixDraft.revision == base)
+        .values(revision=base + len(ops), op_count=RemixDraft.op_count + len(ops),
+                updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.session.rollback()
+        draft = get_draft(author_id, pub_id)
+        raise DraftConflict(draft.revision if draft else 0)
+
+    db.session.add(RemixDraftChunk(draft_id=draft.id, ops=_dump(ops)))
+    db.session.commit()
+
+    chunks = db.session.scalar(select(func.count()).select_from(RemixDraftChunk)
+                               .where(RemixDraftChunk.draft_id == draft.id))
+    if chunks >= DRAFT_COMPACT_CHUNKS:
+        compact(draft.id)
+    return base + len(ops)
+
+
+def compact(draft_id):
+    """Rewrite the log as one chunk that replays to the same strokes, head and redo tail.
+
+    Returns False (and changes nothing) if a batch was appended meanwhile: its
+    chunk would otherwise end up before the rewritten log.
+    """
+    revision = db.session.scalar(select(RemixDraft.revision).where(RemixDraft.id == draft_id))
+    if revision is None:
+        return False
+    # Read after the revision: a batch appended in between changes the revision and is caught below
+    rows = db.session.execute(
+        select(RemixDraftChunk.id, RemixDraftChunk.ops)
+        .where(RemixDraftChunk.draft_id == draft_id).order_by(RemixDraftChunk.id)
+    ).all()
+    if not rows:
+        return False
+    strokes, head = replay([op for _, chunk_ops in rows for op in json.loads(chunk_ops)])
+    ops = strokes + [{'t': 'undo'}] * (len(strokes) - head)
+
+    # Same guard as in append_ops; the rewrite doesn't change what the log replays to,
+    # so the revision stays and clients keep appending to it
+    result = db.session.execute(
+        update(RemixDraft)
+        .where(RemixDraft.id == draft_id, RemixDraft.revision == revision)
+        .values(op_count=len(ops))
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.session.rollback()
+        return False
+    # The revision guard doesn't exclude a second compaction of the same log (it keeps the
+    # revision too); whoever deletes the chunks first wins, the other one finds them gone
+    deleted = db.session.execute(delete(RemixDraftChunk).where(
+        RemixDraftChunk.id.in_([row.id for row in rows])))
+    if deleted.rowcount != len(rows):
+        db.session.rollback()
+        return False
+    if ops:
+        db.session.add(RemixDraftChunk(draft_id=draft_id, ops=_dump(ops)))
+    db.session.commit()
+    return True
+
+
+def discard_draft(author_id, pub_id):
+    """Delete the draft (the caller commits)."""
+    draft = get_draft(author_id, pub_id)
+    if draft is not None:
+        db.session.delete(draft)
+    return draft is not None
+
+
+def _load_ops(draft):
+    ops = []
+    for chunk in draft.chunks:
+        ops.extend(json.loads(chunk.ops))
+    return ops
+
+
+def _dump(ops):
+    return json.dumps(ops, separators=(',', ':'))
+
+
+def _is_number(value):
+    return type(value) in (int, float)
@@ -0,0 +1,154 @@
+"""
+Брокер событий для SSE: LocalBroker рассылает их подписчикам своего процесса,
+RedisBroker - всем воркерам через Redis pub/sub (один поток-слушатель на процесс).
+"""
+import json
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Listener reconnect delay: doubles after every failed attempt up to the maximum
+RECONNECT_DELAY = 0.5  # seconds
+RECONNECT_MAX_DELAY = 30
+
+
+class BrokerSubscription:
+    """Queue of events for one connected client."""
+
+    def __init__(self, broker, channel, max_queue):
+        self.broker = broker
+        self.channel = channel
+        self._queue = queue.Queue(maxsize=max_queue)
+
+    def put(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            # Slow client: drop the event instead of growing memory
+            pass
+
+    def get(self, timeout=None):
+        """Return the next (event, data) pair or None on timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """In-process broker: events reach subscribers of this process only."""
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._channels = defaultdict(set)
+
+    def subscribe(self, channel):
+        sub = BrokerSubscription(self, channel, self.max_queue)
+        with self._lock:
+            self._channels[channel].add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._channels.get(sub.channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._channels[sub.channel]
+
+    def publish(self, channel, event, data):
+        self._dispatch(channel, event, data)
+
+    def subscriber_count(self, channel=None):
+        with self._lock:
+            if channel is not None:
+                return len(self._channels.get(channel, ()))
+            return sum(len(subs) for subs in self._channels.values())
+
+    def _dispatch(self, channel, event, data):
+        with self._lock:
+            subs = list(self._channels.get(channel, ()))
+        for sub in subs:
+            sub.put((event, data))
+
+
+class RedisBroker(LocalBroker):
+    """Broker shared by several worker processes through Redis pub/sub."""
+
+    def __init__(self, url, prefix='artontop:', max_queue=100):
+        import redis
+
+        super().__init__(max_queue=max_queue)
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url)
+        self._redis_error = redis.RedisError
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def subscribe(self, channel):
+        self._ensure_listener()
+        return super().subscribe(channel)
+
+    def publish(self, channel, event, data):
+        message = json.dumps({'event': event, 'data': data}, ensure_ascii=False)
+        self._redis.publish(self.prefix + channel, message)
+
+    def _ensure_listener(self):
+        with self._listener_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        # Events published while the connection is down are lost; the listener
+        # keeps reconnecting for as long as the process lives
+        delay = RECONNECT_DELAY
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(self.prefix + '*')
+                delay = RECONNECT_DELAY
+                for message in pubsub.listen():
+                    self._relay(message)
+            except self._redis_error:
+                logger.exception('Redis event listener disconnected, reconnecting in %.1f s', delay)
+            finally:
+                pubsub.close()
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    def _relay(self, message):
+        try:
+            channel = message['channel']
+            if isinstance(channel, bytes):
+                channel = channel.decode('utf-8')
+            payload = json.loads(message['data'])
+            event, data = payload['event'], payload['data']
+        except (ValueError, KeyError, TypeError):
+            logger.warning('Ignoring malformed event message: %r', message)
+            return
+        self._dispatch(channel[len(self.prefix):], event, data)
+
+
+def create_broker(url=None, max_queue=100):
+    """RedisBroker when a broker URL is configured, LocalBroker otherwise."""
+    if url:
+        return RedisBroker(url, max_queue=max_queue)
+    return LocalBroker(max_queue=max_queue)
+
+
+def format_sse(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append('data: ' + json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+    return '\n'.join(lines) + '\n\n'
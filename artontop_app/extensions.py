@@ -0,0 +1,71 @@
+import threading
+
+from flask import current_app
+from flask_sqlalchemy import SQLAlchemy
+
+from fragments import FragmentCache
+
+# Расширения создаются без приложения и привязываются к нему в create_app
+db = SQLAlchemy()
+_create_lock = threading.Lock()
+
+def init_extensions(app):
+    db.init_app(app)
+    # Состояние процесса (брокер событий, хранилище, кэш фрагментов, пул хеширования, лимиты входа) хранится
+    # в app.extensions, поэтому у каждого приложения (например, в тестах) оно свое.
+    # Брокер, хранилище, пул хеширования и лимиты входа создаются (и их модули импортируются)
+    # при первом обращении через get_*: сборка приложения и команды flask их не ждут.
+    app.extensions['fragment_cache'] = FragmentCache(app.config['FRAGMENT_CACHE_SIZE'],
+                                                     app.config['FRAGMENT_CACHE_TTL'])
+
+def _get_or_create(name, factory):
+    extensions = current_app.extensions
+    if name not in extensions:
+        with _create_lock:
+            if name not in extensions:
+                extensions[name] = factory(current_app.config)
+    return extensions[name]
+
+def _create_broker(config):
+    from events import create_broker
+    return create_broker(config['EVENT_BROKER_URL'])
+
+def _create_storage(config):
+    from storage import create_storage
+    return create_storage(
+        config['UPLOAD_FOLDER'],
+        bucket=config['STORAGE_BUCKET'],
+        endpoint_url=config['STORAGE_ENDPOINT_URL'],
+        region=config['STORAGE_REGION'],
+        access_key=config['STORAGE_ACCESS_KEY'],
+        secret_key=config['STORAGE_SECRET_KEY'],
+        prefix=config['STORAGE_PREFIX'],
+        url_expires=config['STORAGE_URL_EXPIRES'])
+
+def _create_password_hasher(config):
+    # Хеширование паролей идет в пуле процессов, чтобы всплеск логинов не занимал воркеры
+    from security import PasswordHasher
+    return PasswordHasher()
+
+def _create_login_ip_limiter(config):
+    from security import TokenBucketLimiter
+    return TokenBucketLimiter(rate=config['LOGIN_IP_RATE'], capacity=config['LOGIN_IP_CAPACITY'])
+
+def _create_login_email_limiter(config):
+    from security import TokenBucketLimiter
+    return TokenBucketLimiter(rate=config['LOGIN_EMAIL_RATE'], capacity=config['LOGIN_EMAIL_CAPACITY'])
+
+def get_broker():
+    return _get_or_create('broker', _create_broker)
+
+def get_password_hasher():
+    return _get_or_create('password_hasher', _create_password_hasher)
+
+def get_storage():
+    return _get_or_create('storage', _create_storage)
+
+def get_login_ip_limiter():
+    return _get_or_create('login_ip_limiter', _create_login_ip_limiter)
+
+def get_login_email_limiter():
+    return _get_or_create('login_email_limiter', _create_login_email_limiter)
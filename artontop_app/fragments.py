@@ -0,0 +1,37 @@
+"""
+Кэш готовых HTML-фрагментов (LRU с TTL), свой у каждого приложения.
+Ключи включают версии областей из базы, см. helpers.bump_content_version.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered fragments, `max_size` entries kept at most `ttl` seconds."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            html, expires = entry
+            if expires <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return html
+
+    def put(self, key, html):
+        with self._lock:
+            self._entries[key] = (html, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
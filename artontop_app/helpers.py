@@ -0,0 +1,250 @@
+import gzip
+import json
+from collections import defaultdict
+from flask import current_app, g, request, url_for
+from markupsafe import Markup
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db, get_broker, get_storage
+from models import ContentVersion, Publication, PublicationLike, Remix, RemixLike, Subscription, User
+
+# Необязательные ускорители: без них используются json и gzip из стандартной библиотеки
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# --- FRAGMENT CACHE ---
+# Готовый HTML рядов ленты и сетки профиля общий для всех зрителей, поэтому
+# переиспользуется между запросами. Ключ фрагмента включает версию области
+# (scope), которую изменяющие маршруты увеличивают через bump_content_version.
+# Версии хранятся в базе, поэтому изменение на одном воркере (или командой flask)
+# видят все процессы; сам кэш у каждого приложения свой (app.extensions, fragments.py)
+# и вдобавок ограничен по времени FRAGMENT_CACHE_TTL.
+
+GLOBAL_SCOPE = 'all'  # входит в ключ каждого фрагмента: сбрасывает весь кэш
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+def bump_content_version(*scopes):
+    # Вызывается после коммита изменения, фиксирует версии отдельной транзакцией
+    for scope in scopes:
+        bumped = update(ContentVersion).where(ContentVersion.scope == scope).values(
+            version=ContentVersion.version + 1)
+        if not db.session.execute(bumped).rowcount:
+            db.session.add(ContentVersion(scope=scope, version=1))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Строку версии только что создал параллельный запрос
+            db.session.rollback()
+            db.session.execute(bumped)
+            db.session.commit()
+
+def _content_versions(*scopes):
+    # Версии читаются один раз за запрос
+    versions = g.setdefault('content_versions', {})
+    missing = [s for s in scopes if s not in versions]
+    if missing:
+        versions.update(dict.fromkeys(missing, 0))
+        versions.update(db.session.execute(
+            select(ContentVersion.scope, ContentVersion.version).where(ContentVersion.scope.in_(missing))
+        ).all())
+    return tuple(versions[s] for s in scopes)
+
+def cached_fragment(name, *key_parts, scope='feed', caller=None):
+    # Используется в шаблонах как {% call cached_fragment(...) %}...{% endcall %};
+    # тело блока рендерится только при промахе
+    cache = current_app.extensions['fragment_cache']
+    key = (name, key_parts, scope, _content_versions(scope, GLOBAL_SCOPE))
+    html = cache.get(key)
+    if html is None:
+        html = Markup(caller())
+        cache.put(key, html)
+    return html
+
+# --- API HELPERS ---
+
+def fast_jsonify(payload):
+    # Компактная сериализация без сортировки ключей (orjson, если установлен)
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return current_app.response_class(body, mimetype='application/json')
+
+def compress_json(response):
+    # Сжимаем только готовые JSON-ответы API, потоковые ответы не трогаем
+    if (response.mimetype != 'application/json'
+            or response.status_code != 200
+            or response.is_streamed
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    data = response.get_data()
+    if len(data) < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    accepted = request.accept_encodings
+    if brotli is not None and 'br' in accepted:
+        response.set_data(brotli.compress(data, quality=5))
+        response.headers['Content-Encoding'] = 'br'
+    elif 'gzip' in accepted:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    return response
+
+def build_post_payloads(pubs, current_user_id, fields=None):
+    # Данные модального окна сразу для нескольких публикаций:
+    # фиксированное число запросов вместо запросов на каждый ремикс
+    if not pubs:
+        return []
+
+    pub_ids = [p.id for p in pubs]
+    author_ids = {p.author_id for p in pubs}
+    want_remixes = fields is None or 'remixes' in fields
+
+    remixes_by_pub = defaultdict(list)
+    if want_remixes:
+        for r in Remix.query.filter(Remix.original_pub_id.in_(pub_ids)).all():
+            remixes_by_pub[r.original_pub_id].append(r)
+            author_ids.add(r.author_id)
+    remix_ids = [r.id for rs in remixes_by_pub.values() for r in rs]
+
+    authors = {u.id: u for u in User.query.filter(User.id.in_(author_ids)).all()}
+
+    pub_like_counts = dict(
+        db.session.query(PublicationLike.pub_id, func.count(PublicationLike.id))
+        .filter(PublicationLike.pub_id.in_(pub_ids))
+        .group_by(PublicationLike.pub_id).all()
+    )
+    remix_like_counts = {}
+    if remix_ids:
+        remix_like_counts = dict(
+            db.session.query(RemixLike.remix_id, func.count(RemixLike.id))
+            .filter(RemixLike.remix_id.in_(remix_ids))
+            .group_by(RemixLike.remix_id).all()
+        )
+
+    # Лайки и подписки текущего пользователя
+    liked_pub_ids = set()
+    liked_remix_ids = set()
+    subscribed_ids = set()
+    if current_user_id:
+        liked_pub_ids = {row[0] for row in db.session.query(PublicationLike.pub_id).filter(
+            PublicationLike.user_id == current_user_id,
+            PublicationLike.pub_id.in_(pub_ids)
+        ).all()}
+        if remix_ids:
+            liked_remix_ids = {row[0] for row in db.session.query(RemixLike.remix_id).filter(
+                RemixLike.user_id == current_user_id,
+                RemixLike.remix_id.in_(remix_ids)
+            ).all()}
+        subscribed_ids = {row[0] for row in db.session.query(Subscription.following_id).filter(
+            Subscription.follower_id == current_user_id,
+            Subscription.following_id.in_(author_ids)
+        ).all()}
+
+    payloads = []
+    for pub in pubs:
+        author = authors.get(pub.author_id)
+        payload = {
+            'id': pub.id,
+            'image': pub.image,
+            'description': pub.description,
+            'hashtags': pub.hashtags,
+            'pub_type': pub.pub_type,
+            'title': pub.title,
+            'author_name': author.username if author else "Unknown",
+            'author_id': pub.author_id,
+            'is_owner': pub.author_id == current_user_id,
+            'current_user_id': current_user_id,
+            'like_count': pub_like_counts.get(pub.id, 0),
+            'user_liked': pub.id in liked_pub_ids,
+            'is_subscribed': current_user_id != pub.author_id and pub.author_id in subscribed_ids
+        }
+
+        if want_remixes:
+            remixes_list = []
+            for r in remixes_by_pub[pub.id]:
+                remix_author = authors.get(r.author_id)
+                remixes_list.append({
+                    'id': r.id,
+                    'image': r.image,
+                    'author_name': remix_author.username if remix_author else "Unknown",
+                    'author_id': r.author_id,
+                    'date': r.created_at.strftime('%d.%m.%Y'),
+                    'like_count': remix_like_counts.get(r.id, 0),
+                    'user_liked': r.id in liked_remix_ids,
+                    'is_subscribed': current_user_id != r.author_id and r.author_id in subscribed_ids
+                })
+            # Сортируем ремиксы по количеству лайков (от большего к меньшему)
+            remixes_list.sort(key=lambda x: x['like_count'], reverse=True)
+            payload['remixes'] = remixes_list
+
+        if fields is not None:
+            payload = {k: v for k, v in payload.items() if k in fields}
+        payloads.append(payload)
+    return payloads
+
+# --- UPLOADS ---
+
+def is_upload_referenced(filename):
+    # Одно имя файла может использоваться несколькими записями (одинаковые имена загрузок)
+    return (db.session.query(Publication.id).filter_by(image=filename).first() is not None
+            or db.session.query(Remix.id).filter_by(image=filename).first() is not None
+            or db.session.query(User.id).filter_by(avatar=filename).first() is not None)
+
+def save_upload(filename, stream, content_type=None):
+    get_storage().save(filename, stream, content_type)
+
+def remove_upload(filename):
+    # Вызывается после коммита: файл удаляется, только если на него больше никто не ссылается.
+    # Ошибка хранилища не ломает запрос, оставшийся файл уберет collect-garbage
+    if not filename or filename == 'default_avatar.svg' or is_upload_referenced(filename):
+        return
+    storage = get_storage()
+    try:
+        storage.delete(filename)
+    except storage.errors:
+        current_app.logger.warning('Could not delete upload %s', filename, exc_info=True)
+
+def media_url(filename):
+    # Ссылка на загруженный файл для шаблонов. Подписанные ссылки S3 истекают,
+    # поэтому в HTML (и в кэше фрагментов) стоит постоянный адрес /media/<имя>,
+    # который перенаправляет на свежую подписанную ссылку
+    storage = get_storage()
+    if storage.signed_urls:
+        return url_for('media.download', key=filename)
+    return storage.url(filename)
+
+def media_base_url():
+    # Префикс для JS: MEDIA_URL + имя файла дает тот же адрес, что media_url
+    storage = get_storage()
+    if storage.signed_urls:
+        return url_for('media.download', key='_')[:-1]
+    return storage.base_url
+
+# --- EVENTS ---
+
+def post_channel(pub_id):
+    return f'post:{pub_id}'
+
+def publish_post_event(pub_id, event, data):
+    # События рассылаются после коммита; ошибка брокера не должна ломать запрос
+    try:
+        get_broker().publish(post_channel(pub_id), event, data)
+    except Exception as e:
+        print(e)
@@ -0,0 +1,50 @@
+import sqlite3
+import os
+
+# Path to your database
+db_path = os.path.join(os.path.dirname(__file__), 'database.db')
+
+# Connect to database
+conn = sqlite3.connect("/artontop/artontop_app/database.db")
+cursor = conn.cursor()
+
+def table_exists(table_name):
+    """Check if a table exists"""
+    cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}'")
+    return cursor.fetchone() is not None
+
+try:
+    print("Starting database migration for fragment cache versions...\n")
+    
+    # Check if tables exist
+    if not table_exists('user'):
+        print("✗ Error: Database tables don't exist yet!")
+        print("\nPlease create the initial database first:")
+        print("  flask --app app init-db")
+        exit(1)
+    
+    # --- Create ContentVersion table ---
+    if table_exists('content_version'):
+        print("✓ ContentVersion table already exists, skipping creation.")
+    else:
+        print("Creating ContentVersion table...")
+        cursor.execute('''
+            CREATE TABLE content_version (
+                scope VARCHAR(100) PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        print("  ✓ ContentVersion table created")
+    
+    # Commit changes
+    conn.commit()
+    print("\n" + "="*50)
+    print("✓ Content versions migration completed successfully!")
+    print("="*50)
+    
+except sqlite3.Error as e:
+    print(f"\n✗ Error during migration: {e}")
+    conn.rollback()
+    
+finally:
+    conn.close()
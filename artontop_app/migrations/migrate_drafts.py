@@ -0,0 +1,78 @@
+import sqlite3
+import os
+
+# Path to your database
+db_path = os.path.join(os.path.dirname(__file__), 'database.db')
+
+# Connect to database
+conn = sqlite3.connect("/artontop/artontop_app/database.db")
+cursor = conn.cursor()
+
+def table_exists(table_name):
+    """Check if a table exists"""
+    cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}'")
+    return cursor.fetchone() is not None
+
+try:
+    print("Starting database migration for remix drafts...\n")
+    
+    # Check if tables exist
+    if not table_exists('user'):
+        print("✗ Error: Database tables don't exist yet!")
+        print("\nPlease create the initial database first:")
+        print("  flask --app app init-db")
+        exit(1)
+    
+    # --- Create RemixDraft table ---
+    if table_exists('remix_draft'):
+        print("✓ RemixDraft table already exists, skipping creation.")
+    else:
+        print("Creating RemixDraft table...")
+        cursor.execute('''
+            CREATE TABLE remix_draft (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                author_id INTEGER NOT NULL,
+                original_pub_id INTEGER NOT NULL,
+                revision INTEGER NOT NULL DEFAULT 0,
+                op_count INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (author_id) REFERENCES user (id),
+                FOREIGN KEY (original_pub_id) REFERENCES publication (id),
+                CONSTRAINT _draft_author_pub_uc UNIQUE (author_id, original_pub_id)
+            )
+        ''')
+        print("  ✓ RemixDraft table created")
+    
+    # --- Create RemixDraftChunk table ---
+    if table_exists('remix_draft_chunk'):
+        print("✓ RemixDraftChunk table already exists, skipping creation.")
+    else:
+        print("Creating RemixDraftChunk table...")
+        cursor.execute('''
+            CREATE TABLE remix_draft_chunk (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                draft_id INTEGER NOT NULL,
+                ops TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (draft_id) REFERENCES remix_draft (id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX ix_remix_draft_chunk_draft_id
+            ON remix_draft_chunk (draft_id)
+        ''')
+        print("  ✓ RemixDraftChunk table created")
+    
+    # Commit changes
+    conn.commit()
+    print("\n" + "="*50)
+    print("✓ Drafts migration completed successfully!")
+    print("="*50)
+    
+except sqlite3.Error as e:
+    print(f"\n✗ Error during migration: {e}")
+    conn.rollback()
+    
+finally:
+    conn.close()
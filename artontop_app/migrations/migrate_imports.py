@@ -0,0 +1,54 @@
+import sqlite3
+import os
+
+# Path to your database
+db_path = os.path.join(os.path.dirname(__file__), 'database.db')
+
+# Connect to database
+conn = sqlite3.connect("/artontop/artontop_app/database.db")
+cursor = conn.cursor()
+
+def table_exists(table_name):
+    """Check if a table exists"""
+    cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}'")
+    return cursor.fetchone() is not None
+
+try:
+    print("Starting database migration for data imports...\n")
+    
+    # Check if tables exist
+    if not table_exists('user'):
+        print("✗ Error: Database tables don't exist yet!")
+        print("\nPlease create the initial database first:")
+        print("  flask --app app init-db")
+        exit(1)
+    
+    # --- Create ImportedRow table ---
+    if table_exists('imported_row'):
+        print("✓ ImportedRow table already exists, skipping creation.")
+    else:
+        print("Creating ImportedRow table...")
+        cursor.execute('''
+            CREATE TABLE imported_row (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                export_id VARCHAR(64) NOT NULL,
+                record_type VARCHAR(50) NOT NULL,
+                source_id INTEGER NOT NULL,
+                target_id INTEGER NOT NULL,
+                CONSTRAINT _import_source_uc UNIQUE (export_id, record_type, source_id)
+            )
+        ''')
+        print("  ✓ ImportedRow table created")
+    
+    # Commit changes
+    conn.commit()
+    print("\n" + "="*50)
+    print("✓ Imports migration completed successfully!")
+    print("="*50)
+    
+except sqlite3.Error as e:
+    print(f"\n✗ Error during migration: {e}")
+    conn.rollback()
+    
+finally:
+    conn.close()
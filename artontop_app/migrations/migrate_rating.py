@@ -0,0 +1,68 @@
+import sqlite3
+import os
+
+# Path to your database
+db_path = os.path.join(os.path.dirname(__file__), 'database.db')
+
+# Connect to database
+conn = sqlite3.connect("/artontop/artontop_app/database.db")
+cursor = conn.cursor()
+
+def table_exists(table_name):
+    """Check if a table exists"""
+    cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}'")
+    return cursor.fetchone() is not None
+
+def column_exists(table_name, column_name):
+    """Check if a column exists in a table"""
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    columns = [column[1] for column in cursor.fetchall()]
+    return column_name in columns
+
+def index_exists(index_name):
+    """Check if an index exists"""
+    cursor.execute(f"SELECT name FROM sqlite_master WHERE type='index' AND name='{index_name}'")
+    return cursor.fetchone() is not None
+
+try:
+    print("Starting database migration for ratings...\n")
+    
+    # Check if tables exist
+    if not table_exists('user'):
+        print("✗ Error: Database tables don't exist yet!")
+        print("\nPlease create the initial database first:")
+        print("  flask --app app init-db")
+        exit(1)
+    
+    # --- Update User table ---
+    print("Updating User table...")
+    
+    if not column_exists('user', 'publications_count'):
+        print("  Adding 'publications_count' column...")
+        cursor.execute('''
+            ALTER TABLE user 
+            ADD COLUMN publications_count INTEGER DEFAULT 0
+        ''')
+        print("  ✓ Added 'publications_count' column")
+    
+    if not index_exists('ix_user_rating'):
+        print("  Creating leaderboard index...")
+        cursor.execute('''
+            CREATE INDEX ix_user_rating
+            ON user (rating)
+        ''')
+        print("  ✓ Index 'ix_user_rating' created")
+    
+    # Commit changes
+    conn.commit()
+    print("\n" + "="*50)
+    print("✓ Ratings migration completed successfully!")
+    print("Run 'flask --app app recompute-ratings' to fill the counters.")
+    print("="*50)
+    
+except sqlite3.Error as e:
+    print(f"\n✗ Error during migration: {e}")
+    conn.rollback()
+    
+finally:
+    conn.close()
@@ -0,0 +1,73 @@
+import sqlite3
+import os
+
+# Path to your database
+db_path = os.path.join(os.path.dirname(__file__), 'database.db')
+
+# Connect to database
+conn = sqlite3.connect("/artontop/artontop_app/database.db")
+cursor = conn.cursor()
+
+def table_exists(table_name):
+    """Check if a table exists"""
+    cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}'")
+    return cursor.fetchone() is not None
+
+try:
+    print("Starting database migration for recommendations...\n")
+    
+    # Check if tables exist
+    if not table_exists('user'):
+        print("✗ Error: Database tables don't exist yet!")
+        print("\nPlease create the initial database first:")
+        print("  flask --app app init-db")
+        exit(1)
+    
+    # --- Create UserRecommendation table ---
+    if table_exists('user_recommendation'):
+        print("✓ UserRecommendation table already exists, skipping creation.")
+    else:
+        print("Creating UserRecommendation table...")
+        cursor.execute('''
+            CREATE TABLE user_recommendation (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                recommended_id INTEGER NOT NULL,
+                score FLOAT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES user (id),
+                FOREIGN KEY (recommended_id) REFERENCES user (id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX ix_user_recommendation_user_score
+            ON user_recommendation (user_id, score)
+        ''')
+        print("  ✓ UserRecommendation table created")
+    
+    # --- Create JobState table ---
+    if table_exists('job_state'):
+        print("✓ JobState table already exists, skipping creation.")
+    else:
+        print("Creating JobState table...")
+        cursor.execute('''
+            CREATE TABLE job_state (
+                name VARCHAR(50) PRIMARY KEY,
+                last_run_at TIMESTAMP
+            )
+        ''')
+        print("  ✓ JobState table created")
+    
+    # Commit changes
+    conn.commit()
+    print("\n" + "="*50)
+    print("✓ Recommendations migration completed successfully!")
+    print("Run 'flask --app app build-recommendations --full' to fill the table.")
+    print("="*50)
+    
+except sqlite3.Error as e:
+    print(f"\n✗ Error during migration: {e}")
+    conn.rollback()
+    
+finally:
+    conn.close()
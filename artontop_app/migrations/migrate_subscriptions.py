@@ -19,9 +19,9 @@ try:
     # Check if tables exist
     if not table_exists('user'):
         print("✗ Error: Database tables don't exist yet!")
-        print("\nPlease run the application first to create the initial database:")
-        print("  python app.py")
-        print("\nThe app will create the database on first run, then you can run this migration.")
+        print("\nPlease create the initial database first:")
+        print("  flask --app app init-db")
+        print("\nThen you can run this migration.")
         exit(1)
     
     # --- Create Subscription table ---
@@ -0,0 +1,155 @@
+from datetime import datetime
+
+from extensions import db
+
+# --- MODELS ---
+
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80))
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password = db.Column(db.String(200), nullable=False)
+    avatar = db.Column(db.String(200), default='default_avatar.svg')
+    bio = db.Column(db.Text, nullable=True)
+    # Счетчики ведутся инкрементально (rating.py), профиль их только читает
+    rating = db.Column(db.Integer, default=0, index=True)
+    subscribers_count = db.Column(db.Integer, default=0)
+    publications_count = db.Column(db.Integer, default=0)
+
+class Publication(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    image = db.Column(db.String(200))
+    description = db.Column(db.Text, nullable=True)
+    hashtags = db.Column(db.String(200))
+    pub_type = db.Column(db.String(50)) 
+    author_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    title = db.Column(db.String(100))
+    pinned = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Remix(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    image = db.Column(db.String(200)) 
+    original_pub_id = db.Column(db.Integer, db.ForeignKey('publication.id'))
+    author_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    author = db.relationship('User', backref='remixes')
+    # При удалении публикации удаляются и ее ремиксы (вместе с их лайками и комментариями)
+    original = db.relationship('Publication', backref=db.backref('remixes', cascade='all, delete-orphan'))
+
+# Модель для комментариев к ремиксам
+class RemixComment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    remix_id = db.Column(db.Integer, db.ForeignKey('remix.id'))
+    author_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    author = db.relationship('User', backref='remix_comments')
+    remix = db.relationship('Remix', backref=db.backref('comments', cascade='all, delete-orphan'))
+
+# [НОВОЕ] Модель для комментариев к оригинальным публикациям
+class PublicationComment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    pub_id = db.Column(db.Integer, db.ForeignKey('publication.id'))
+    author_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    author = db.relationship('User', backref='pub_comments')
+    publication = db.relationship('Publication', backref=db.backref('comments', cascade='all, delete-orphan'))
+
+# Модель для лайков публикаций
+class PublicationLike(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    pub_id = db.Column(db.Integer, db.ForeignKey('publication.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Уникальная пара: один пользователь может лайкнуть публикацию только один раз
+    __table_args__ = (db.UniqueConstraint('pub_id', 'user_id', name='_pub_user_like_uc'),)
+    
+    user = db.relationship('User', backref='pub_likes')
+    publication = db.relationship('Publication', backref=db.backref('likes', cascade='all, delete-orphan'))
+
+# Модель для лайков ремиксов
+class RemixLike(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    remix_id = db.Column(db.Integer, db.ForeignKey('remix.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Уникальная пара: один пользователь может лайкнуть ремикс только один раз
+    __table_args__ = (db.UniqueConstraint('remix_id', 'user_id', name='_remix_user_like_uc'),)
+    
+    user = db.relationship('User', backref='remix_likes')
+    remix = db.relationship('Remix', backref=db.backref('likes', cascade='all, delete-orphan'))
+
+# Модель для подписок
+class Subscription(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    follower_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # кто подписывается
+    following_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # на кого подписываются
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Уникальная пара: один пользователь может подписаться на другого только один раз
+    __table_args__ = (db.UniqueConstraint('follower_id', 'following_id', name='_follower_following_uc'),)
+    
+    follower = db.relationship('User', foreign_keys=[follower_id], backref='following')
+    following = db.relationship('User', foreign_keys=[following_id], backref='followers')
+
+# Рекомендации "кого читать", рассчитываются офлайн командой build-recommendations
+class UserRecommendation(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # кому рекомендуем
+    recommended_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # кого рекомендуем
+    score = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_user_recommendation_user_score', 'user_id', 'score'),)
+
+# Состояние фоновых задач (время последнего запуска для инкрементальных пересчетов)
+class JobState(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    last_run_at = db.Column(db.DateTime, nullable=True)
+
+# Версии областей кэша фрагментов (общие для всех воркеров и команд flask)
+class ContentVersion(db.Model):
+    scope = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# Черновик ремикса: журнал операций редактора (штрихи, отмена, повтор), пополняется автосохранением
+class RemixDraft(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    original_pub_id = db.Column(db.Integer, db.ForeignKey('publication.id'), nullable=False)
+    revision = db.Column(db.Integer, nullable=False, default=0)  # сколько операций принято всего
+    op_count = db.Column(db.Integer, nullable=False, default=0)  # сколько операций хранится после сжатия
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Один черновик на пользователя и публикацию
+    __table_args__ = (db.UniqueConstraint('author_id', 'original_pub_id', name='_draft_author_pub_uc'),)
+
+    original = db.relationship('Publication', backref=db.backref('drafts', cascade='all, delete-orphan'))
+
+# Порция операций черновика (одно автосохранение); порядок - по id
+class RemixDraftChunk(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    draft_id = db.Column(db.Integer, db.ForeignKey('remix_draft.id'), nullable=False, index=True)
+    ops = db.Column(db.Text, nullable=False)  # JSON-массив операций
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    draft = db.relationship('RemixDraft', backref=db.backref('chunks', cascade='all, delete-orphan',
+                                                             order_by='RemixDraftChunk.id'))
+
+# Строки, перенесенные import-data (старый id -> новый id): повторный или прерванный импорт той же выгрузки их пропускает
+class ImportedRow(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    export_id = db.Column(db.String(64), nullable=False)
+    record_type = db.Column(db.String(50), nullable=False)
+    source_id = db.Column(db.Integer, nullable=False)
+    target_id = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (db.UniqueConstraint('export_id', 'record_type', 'source_id', name='_import_source_uc'),)
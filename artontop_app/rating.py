@@ -0,0 +1,150 @@
+"""
+Рейтинг авторов и счетчики профиля: маршруты меняют их относительными UPDATE в своей транзакции,
+ночная сверка пересчитывает по таблицам событий (cron: flask --app app recompute-ratings).
+"""
+import time
+
+from sqlalchemy import and_, func, or_, select, update
+
+from extensions import db
+from models import Publication, PublicationLike, Remix, RemixLike, Subscription, User
+
+# rating = LIKE_POINTS * likes + REMIX_POINTS * remixes of the user's works + SUBSCRIBER_POINTS * subscribers;
+# the author's own likes and remixes don't count
+LIKE_POINTS = 1
+REMIX_POINTS = 3
+SUBSCRIBER_POINTS = 5
+WRITE_BATCH = 1000
+
+
+def adjust_counters(user_id, rating=0, subscribers=0, publications=0):
+    """Add deltas to a user's counters (the caller commits)."""
+    if not user_id or not (rating or subscribers or publications):
+        return
+    db.session.execute(
+        update(User).where(User.id == user_id).values(
+            rating=User.rating + rating,
+            subscribers_count=User.subscribers_count + subscribers,
+            publications_count=User.publications_count + publications,
+        ).execution_options(synchronize_session=False)
+    )
+
+
+def on_like(author_id, liker_id, liked):
+    """A like of a publication or remix by `author_id` was added (liked=True) or removed."""
+    if author_id != liker_id:
+        adjust_counters(author_id, rating=LIKE_POINTS if liked else -LIKE_POINTS)
+
+
+def on_remix(original_author_id, remix_author_id):
+    if original_author_id != remix_author_id:
+        adjust_counters(original_author_id, rating=REMIX_POINTS)
+
+
+def on_subscription(user_id, subscribed):
+    sign = 1 if subscribed else -1
+    adjust_counters(user_id, rating=sign * SUBSCRIBER_POINTS, subscribers=sign)
+
+
+def on_publication_deleted(pub):
+    """Take back what `pub`, its remixes and their likes gave to authors (before the delete is committed)."""
+    pub_likes = db.session.scalar(select(func.count()).select_from(PublicationLike).where(
+        PublicationLike.pub_id == pub.id, PublicationLike.user_id != pub.author_id))
+    remixes = db.session.scalar(select(func.count()).select_from(Remix).where(
+        Remix.original_pub_id == pub.id, Remix.author_id != pub.author_id))
+    adjust_counters(pub.author_id, rating=-(LIKE_POINTS * pub_likes + REMIX_POINTS * remixes), publications=-1)
+
+    remix_likes = db.session.execute(
+        select(Remix.author_id, func.count()).select_from(RemixLike)
+        .join(Remix, Remix.id == RemixLike.remix_id)
+        .where(Remix.original_pub_id == pub.id, RemixLike.user_id != Remix.author_id)
+        .group_by(Remix.author_id)
+    ).all()
+    for author_id, count in remix_likes:
+        adjust_counters(author_id, rating=-LIKE_POINTS * count)
+
+
+def on_remix_deleted(remix):
+    """Take back what `remix` and its likes gave to authors (before the delete is committed)."""
+    if remix.original is not None and remix.original.author_id != remix.author_id:
+        adjust_counters(remix.original.author_id, rating=-REMIX_POINTS)
+    likes = db.session.scalar(select(func.count()).select_from(RemixLike).where(
+        RemixLike.remix_id == remix.id, RemixLike.user_id != remix.author_id))
+    adjust_counters(remix.author_id, rating=-LIKE_POINTS * likes)
+
+
+def recompute_ratings(user_ids=None, log=None):
+    """Rebuild the counters from the event tables, for `user_ids` or everyone.
+
+    Returns {'users': checked, 'updated': drifted, 'seconds': ...}.
+    """
+    started = time.time()
+    ids = None if user_ids is None else {i for i in user_ids if i}
+    if ids is not None and not ids:
+        return {'users': 0, 'updated': 0, 'seconds': 0.0}
+
+    totals = {}
+
+    def add(query, field, weight=1):
+        for user_id, count in db.session.execute(query):
+            values = totals.setdefault(user_id, {'rating': 0, 'subscribers_count': 0, 'publications_count': 0})
+            if field:
+                values[field] += count
+            values['rating'] += weight * count
+
+    def restrict(query, column):
+        return query if ids is None else query.where(column.in_(ids))
+
+    pub_author = Publication.author_id
+    add(restrict(select(pub_author, func.count()).select_from(PublicationLike)
+                 .join(Publication, Publication.id == PublicationLike.pub_id)
+                 .where(PublicationLike.user_id != pub_author)
+                 .group_by(pub_author), pub_author), None, LIKE_POINTS)
+    add(restrict(select(Remix.author_id, func.count()).select_from(RemixLike)
+                 .join(Remix, Remix.id == RemixLike.remix_id)
+                 .where(RemixLike.user_id != Remix.author_id)
+                 .group_by(Remix.author_id), Remix.author_id), None, LIKE_POINTS)
+    add(restrict(select(pub_author, func.count()).select_from(Remix)
+                 .join(Publication, Publication.id == Remix.original_pub_id)
+                 .where(Remix.author_id != pub_author)
+                 .group_by(pub_author), pub_author), None, REMIX_POINTS)
+    add(restrict(select(Subscription.following_id, func.count())
+                 .group_by(Subscription.following_id), Subscription.following_id),
+        'subscribers_count', SUBSCRIBER_POINTS)
+    add(restrict(select(pub_author, func.count()).group_by(pub_author), pub_author),
+        'publications_count', 0)
+
+    current = restrict(select(User.id, User.rating, User.subscribers_count, User.publications_count), User.id)
+    checked, changes = 0, []
+    empty = {'rating': 0, 'subscribers_count': 0, 'publications_count': 0}
+    for user_id, rating, subscribers, publications in db.session.execute(current):
+        checked += 1
+        values = totals.get(user_id, empty)
+        if (rating, subscribers, publications) != (values['rating'], values['subscribers_count'],
+                                                   values['publications_count']):
+            changes.append({'id': user_id, **values})
+
+    for start in range(0, len(changes), WRITE_BATCH):
+        db.session.execute(update(User), changes[start:start + WRITE_BATCH])
+        db.session.commit()
+    db.session.commit()
+
+    stats = {'users': checked, 'updated': len(changes), 'seconds': time.time() - started}
+    if log:
+        log(f"ratings: {stats['users']} users checked, {stats['updated']} corrected")
+    return stats
+
+
+def leaderboard_page(limit, after=None):
+    """Top users by rating, `limit` per page; `after` is the (rating, id) of the last row seen.
+
+    Keyset paging walks ix_user_rating (rating DESC, then id DESC), so any page
+    costs the same as the first one.
+    """
+    query = select(User).order_by(User.rating.desc(), User.id.desc()).limit(limit + 1)
+    if after is not None:
+        rating, user_id = after
+        query = query.where(or_(User.rating < rating, and_(User.rating == rating, User.id < user_id)))
+    users = db.session.scalars(query).all()
+    next_key = (users[limit - 1].rating, users[limit - 1].id) if len(users) > limit else None
+    return users[:limit], next_key
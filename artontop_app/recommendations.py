@@ -0,0 +1,171 @@
+"""
+Офлайн-расчет рекомендаций "кого читать" по разреженным матрицам подписок и лайков
+(друзья друзей, общие лайки, любимые авторы). Запуск: flask --app app build-recommendations [--full]
+"""
+import time
+from datetime import datetime
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, func, insert, select
+
+from extensions import db
+from models import JobState, Publication, PublicationLike, Remix, RemixLike, Subscription, User, UserRecommendation
+
+JOB_NAME = 'recommendations'
+FOF_WEIGHT = 1.0
+COLIKE_WEIGHT = 0.5
+AUTHOR_WEIGHT = 1.0
+COLIKE_MAX_LIKERS = 500  # more popular items are left out of co-likes: little signal, dense rows
+CHUNK_SIZE = 2000  # users scored per sparse product; bounds peak memory
+WRITE_BATCH = 5000
+
+
+class SocialGraph:
+    """Sparse matrices of follows, likes and item authors. User index == User.id."""
+
+    def __init__(self):
+        n_users = (db.session.scalar(select(func.max(User.id))) or 0) + 1
+        # Remix items are placed after publication items
+        self.remix_offset = (db.session.scalar(select(func.max(Publication.id))) or 0) + 1
+        n_items = self.remix_offset + (db.session.scalar(select(func.max(Remix.id))) or 0) + 1
+        self.n_users = n_users
+
+        followers, followings = _load_pairs(select(Subscription.follower_id, Subscription.following_id))
+        self.follows = _binary_matrix(followers, followings, (n_users, n_users))
+        self.followed_by = self.follows.T.tocsr()
+
+        users, items = self._load_likes()
+        self.likes = _binary_matrix(users, items, (n_users, n_items))
+        self.liked_by = self.likes.T.tocsr()
+        niche = (np.diff(self.liked_by.indptr) <= COLIKE_MAX_LIKERS).astype(np.float32)
+        self.colike_by = (sparse.diags(niche) @ self.liked_by).tocsr()
+        self.colike_by.eliminate_zeros()
+
+        pub_ids, pub_authors = _load_pairs(select(Publication.id, Publication.author_id))
+        remix_ids, remix_authors = _load_pairs(select(Remix.id, Remix.author_id))
+        self.item_authors = _binary_matrix(
+            np.concatenate([pub_ids, remix_ids + self.remix_offset]),
+            np.concatenate([pub_authors, remix_authors]),
+            (n_items, n_users)
+        )
+
+    def _load_likes(self, since=None):
+        pub_query = select(PublicationLike.user_id, PublicationLike.pub_id)
+        remix_query = select(RemixLike.user_id, RemixLike.remix_id)
+        if since is not None:
+            pub_query = pub_query.where(PublicationLike.created_at > since)
+            remix_query = remix_query.where(RemixLike.created_at > since)
+        pub_users, pub_items = _load_pairs(pub_query)
+        remix_users, remix_items = _load_pairs(remix_query)
+        return (np.concatenate([pub_users, remix_users]),
+                np.concatenate([pub_items, remix_items + self.remix_offset]))
+
+    def dirty_users(self, since):
+        """Users whose recommendation rows may have changed after `since`."""
+        new_followers, _ = _load_pairs(select(Subscription.follower_id, Subscription.following_id)
+                                       .where(Subscription.created_at > since))
+        new_likers, new_items = self._load_likes(since)
+
+        dirty = [new_followers, new_likers,
+                 # Their followers see a different friends-of-friends row
+                 _row_indices(self.followed_by, new_followers),
+                 # Everyone who liked the same items gets new co-likes
+                 _row_indices(self.colike_by, new_items)]
+        users = np.unique(np.concatenate(dirty))
+        return users[users < self.n_users]
+
+    def score(self, users):
+        """Sparse score matrix (len(users) x n_users) for the given user ids."""
+        follows = self.follows[users]
+        likes = self.likes[users]
+        scores = (FOF_WEIGHT * (follows @ self.follows)
+                  + COLIKE_WEIGHT * (likes @ self.colike_by)
+                  + AUTHOR_WEIGHT * (likes @ self.item_authors)).tocsr()
+
+        # Drop the user themself and people they already follow
+        own = sparse.csr_matrix((np.ones(len(users), dtype=np.float32), (np.arange(len(users)), users)),
+                                shape=scores.shape)
+        excluded = (follows + own) > 0
+        scores = scores - scores.multiply(excluded)
+        scores.eliminate_zeros()
+        return scores.tocsr()
+
+
+def build_recommendations(top_n=20, full=False):
+    started = time.monotonic()
+    run_at = datetime.utcnow()
+
+    state = db.session.get(JobState, JOB_NAME)
+    full = full or state is None or state.last_run_at is None
+
+    graph = SocialGraph()
+    if full:
+        users = np.arange(graph.n_users)
+    else:
+        # Removed follows and likes leave no timestamp, so a periodic --full run is still needed
+        users = graph.dirty_users(state.last_run_at)
+
+    rows_written = 0
+    for start in range(0, len(users), CHUNK_SIZE):
+        chunk = users[start:start + CHUNK_SIZE]
+        scores = graph.score(chunk)
+        rows = [
+            {'user_id': int(chunk[i]), 'recommended_id': int(rec), 'score': float(score), 'created_at': run_at}
+            for i, recs, values in _top_n_per_row(scores, top_n)
+            for rec, score in zip(recs, values)
+        ]
+        # Rows are replaced chunk by chunk so readers never see an empty table
+        db.session.execute(delete(UserRecommendation).where(UserRecommendation.user_id.in_(chunk.tolist())))
+        for batch_start in range(0, len(rows), WRITE_BATCH):
+            db.session.execute(insert(UserRecommendation), rows[batch_start:batch_start + WRITE_BATCH])
+        rows_written += len(rows)
+        db.session.commit()
+
+    if state is None:
+        state = JobState(name=JOB_NAME)
+        db.session.add(state)
+    # Edges created while the job was running are picked up by the next run
+    state.last_run_at = run_at
+    db.session.commit()
+
+    return {'users': len(users), 'rows': rows_written, 'full': full,
+            'seconds': time.monotonic() - started}
+
+
+def _load_pairs(query):
+    rows = db.session.execute(query).all()
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    pairs = np.array(rows, dtype=np.int64)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def _binary_matrix(rows, cols, shape):
+    matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=shape)
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix
+
+
+def _row_indices(matrix, rows):
+    """Column indices of all non-zeros in the given rows."""
+    rows = rows[rows < matrix.shape[0]]
+    if len(rows) == 0:
+        return np.empty(0, dtype=np.int64)
+    return matrix[np.unique(rows)].indices.astype(np.int64)
+
+
+def _top_n_per_row(scores, n):
+    for i in range(scores.shape[0]):
+        start, end = scores.indptr[i], scores.indptr[i + 1]
+        if start == end:
+            continue
+        values = scores.data[start:end]
+        cols = scores.indices[start:end]
+        if len(values) > n:
+            idx = np.argpartition(-values, n)[:n]
+        else:
+            idx = np.arange(len(values))
+        idx = idx[np.argsort(-values[idx], kind='stable')]
+        yield i, cols[idx], values[idx]
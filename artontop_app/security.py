@@ -0,0 +1,134 @@
+"""
+Хеширование паролей в пуле процессов с пониженным приоритетом и лимиты попыток входа.
+Модуль должен оставаться легким: воркеры пула (spawn) импортируют его без приложения Flask.
+"""
+import os
+import threading
+import time
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Current hash parameters; hashes made with other parameters are upgraded on login
+PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'
+HASH_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+HASH_WORKER_NICENESS = 10
+# Logins waiting for a worker cost nothing, rejected ones are retried at once and load the
+# request workers; 64 waiting logins take about 2 s to drain on one worker
+HASH_QUEUE_LIMIT = 64
+HASH_TIMEOUT = 10  # seconds
+
+
+class HashingBusy(Exception):
+    """The hashing queue is full."""
+
+
+class PasswordHasher:
+    def __init__(self, workers=HASH_WORKERS, queue_limit=HASH_QUEUE_LIMIT, timeout=HASH_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(queue_limit)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def hash(self, password):
+        return self._run(_hash, password, PASSWORD_HASH_METHOD)
+
+    def verify(self, pwhash, password):
+        return self._run(_verify, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        return pwhash.split('$', 1)[0] != PASSWORD_HASH_METHOD
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        if self.workers == 0:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._reset_pool()
+            raise HashingBusy()
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the task is really finished or cancelled, so
+        # HASH_QUEUE_LIMIT bounds the work in the pool, not just the waiting callers
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # A task still in the queue is dropped; a running one keeps its slot until it ends
+            future.cancel()
+            raise HashingBusy()
+        except BrokenProcessPool:
+            self._reset_pool()
+            raise HashingBusy()
+
+    def _reset_pool(self):
+        # A worker died; the next call starts a fresh pool
+        with self._pool_lock:
+            self._pool = None
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                # spawn: forking a threaded server process is unsafe
+                context = multiprocessing.get_context('spawn')
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                                 initializer=_lower_priority)
+            return self._pool
+
+
+def _lower_priority():
+    if hasattr(os, 'nice'):
+        os.nice(HASH_WORKER_NICENESS)
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _verify(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+
+class TokenBucketLimiter:
+    """In-memory token buckets: `capacity` attempts at once, refilled at `rate` per second."""
+
+    def __init__(self, rate, capacity, max_keys=100000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key):
+        """Take one token. Returns (allowed, seconds until the next token)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed, retry_after = True, 0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, (1 - tokens) / self.rate
+            if len(self._buckets) > self.max_keys:
+                self._evict_full(now)
+        return allowed, retry_after
+
+    def _evict_full(self, now):
+        # Buckets that have refilled completely carry no state worth keeping
+        for key, (tokens, updated) in list(self._buckets.items()):
+            if tokens + (now - updated) * self.rate >= self.capacity:
+                del self._buckets[key]
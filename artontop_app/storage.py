@@ -0,0 +1,186 @@
+"""
+Хранилище загрузок: LocalStorage (папка static/uploads) или S3Storage (S3, MinIO; ссылки presigned).
+Интерфейс общий: save, open, exists, delete, iter_files, url, errors; boto3 импортируется при первом обращении.
+"""
+import os
+import shutil
+import tempfile
+import threading
+from urllib.parse import quote
+
+CHUNK_SIZE = 8 * 1024 * 1024  # multipart part size; S3 requires at least 5 MB
+POOL_SIZE = 20  # connections per process
+URL_EXPIRES = 3600  # seconds a presigned URL stays valid
+
+
+class LocalStorage:
+    """Files in a local directory, served by the web server under base_url."""
+
+    signed_urls = False
+    errors = (OSError,)
+
+    def __init__(self, root, base_url='/static/uploads/'):
+        self.root = root
+        self.base_url = base_url
+
+    def save(self, key, stream, content_type=None):
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                shutil.copyfileobj(stream, f, CHUNK_SIZE)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def open(self, key):
+        f = open(self._path(key), 'rb')
+        return f, os.fstat(f.fileno()).st_size
+
+    def exists(self, key):
+        return os.path.isfile(self._path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def iter_files(self):
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.startswith('.upload-'):
+                    stat = entry.stat()
+                    yield entry.name, stat.st_size, stat.st_mtime
+
+    def url(self, key):
+        return self.base_url + quote(key)
+
+    def _path(self, key):
+        # Keys are plain file names; nothing may be written outside the root
+        if not key or key != os.path.basename(key) or key.startswith('.'):
+            raise ValueError(f'Invalid storage key: {key!r}')
+        return os.path.join(self.root, key)
+
+
+class S3Storage:
+    """Files in an S3-compatible bucket, downloaded through presigned URLs."""
+
+    signed_urls = True
+
+    def __init__(self, bucket, endpoint_url=None, region=None, access_key=None, secret_key=None,
+                 prefix='', chunk_size=CHUNK_SIZE, pool_size=POOL_SIZE, url_expires=URL_EXPIRES):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.chunk_size = max(chunk_size, 5 * 1024 * 1024)
+        self.url_expires = url_expires
+        self._client_options = {
+            'endpoint_url': endpoint_url,
+            'region_name': region,
+            'aws_access_key_id': access_key,
+            'aws_secret_access_key': secret_key,
+        }
+        self._pool_size = pool_size
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def errors(self):
+        # Network failures are BotoCoreError, refusals by the server ClientError
+        from botocore.exceptions import BotoCoreError, ClientError
+        return (OSError, BotoCoreError, ClientError)
+
+    def save(self, key, stream, content_type=None):
+        client = self._get_client()
+        extra = {'ContentType': content_type} if content_type else {}
+        chunk = _read_chunk(stream, self.chunk_size)
+        if len(chunk) < self.chunk_size:
+            client.put_object(Bucket=self.bucket, Key=self._key(key), Body=chunk, **extra)
+            return
+
+        upload_id = client.create_multipart_upload(Bucket=self.bucket, Key=self._key(key), **extra)['UploadId']
+        parts = []
+        try:
+            while chunk:
+                number = len(parts) + 1
+                response = client.upload_part(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id,
+                                              PartNumber=number, Body=chunk)
+                parts.append({'PartNumber': number, 'ETag': response['ETag']})
+                chunk = _read_chunk(stream, self.chunk_size)
+            client.complete_multipart_upload(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id,
+                                             MultipartUpload={'Parts': parts})
+        except BaseException:
+            client.abort_multipart_upload(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id)
+            raise
+
+    def open(self, key):
+        client = self._get_client()
+        try:
+            response = client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except client.exceptions.NoSuchKey:
+            raise FileNotFoundError(key)
+        return response['Body'], response['ContentLength']
+
+    def exists(self, key):
+        client = self._get_client()
+        try:
+            client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except client.exceptions.ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+        return True
+
+    def delete(self, key):
+        # Deleting a missing object is not an error in S3
+        self._get_client().delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def iter_files(self):
+        paginator = self._get_client().get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get('Contents', ()):
+                key = obj['Key'][len(self.prefix):]
+                if key and '/' not in key:
+                    yield key, obj['Size'], obj['LastModified'].timestamp()
+
+    def url(self, key):
+        return self._get_client().generate_presigned_url(
+            'get_object', Params={'Bucket': self.bucket, 'Key': self._key(key)}, ExpiresIn=self.url_expires)
+
+    def _key(self, key):
+        return self.prefix + key
+
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                import boto3
+                from botocore.config import Config
+
+                config = Config(max_pool_connections=self._pool_size, signature_version='s3v4',
+                                retries={'max_attempts': 3, 'mode': 'standard'},
+                                # MinIO and most self-hosted servers expect path-style URLs
+                                s3={'addressing_style': 'path'})
+                self._client = boto3.session.Session().client('s3', config=config, **self._client_options)
+            return self._client
+
+
+def _read_chunk(stream, size):
+    """Read exactly `size` bytes unless the stream ends first (streams may return short reads)."""
+    parts = []
+    remaining = size
+    while remaining > 0:
+        data = stream.read(remaining)
+        if not data:
+            break
+        parts.append(data)
+        remaining -= len(data)
+    return b''.join(parts)
+
+
+def create_storage(upload_folder, bucket=None, **s3_options):
+    """S3Storage when a bucket is configured, LocalStorage otherwise."""
+    if bucket:
+        return S3Storage(bucket, **s3_options)
+    return LocalStorage(upload_folder)
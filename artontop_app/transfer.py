@@ -0,0 +1,300 @@
+"""
+Перенос данных между базами: export-data пишет data.ndjson.gz и media.tar, import-data их загружает.
+Повторный или прерванный импорт той же выгрузки пропускает уже перенесенные строки (imported_row).
+"""
+import gzip
+import hashlib
+import json
+import os
+import tarfile
+import tempfile
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from werkzeug.utils import secure_filename
+
+from extensions import db, get_storage
+from helpers import GLOBAL_SCOPE, bump_content_version
+from models import (ImportedRow, Publication, PublicationComment, PublicationLike, Remix, RemixComment,
+                    RemixLike, Subscription, User)
+from rating import recompute_ratings
+
+FORMAT_VERSION = 1
+DATA_FILE = 'data.ndjson.gz'
+MEDIA_FILE = 'media.tar'
+BATCH_SIZE = 1000
+CHUNK_SIZE = 1024 * 1024
+SPOOL_SIZE = 8 * 1024 * 1024  # media files larger than this are buffered on disk during import
+DEFAULT_AVATAR = 'default_avatar.svg'
+
+# (record type, model, {foreign key column: record type it points to}), parents first
+TABLES = [
+    ('user', User, {}),
+    ('publication', Publication, {'author_id': 'user'}),
+    ('remix', Remix, {'original_pub_id': 'publication', 'author_id': 'user'}),
+    ('publication_like', PublicationLike, {'pub_id': 'publication', 'user_id': 'user'}),
+    ('remix_like', RemixLike, {'remix_id': 'remix', 'user_id': 'user'}),
+    ('publication_comment', PublicationComment, {'pub_id': 'publication', 'author_id': 'user'}),
+    ('remix_comment', RemixComment, {'remix_id': 'remix', 'author_id': 'user'}),
+    ('subscription', Subscription, {'follower_id': 'user', 'following_id': 'user'}),
+]
+# Types whose ids are referenced by other rows and therefore remapped
+REMAPPED = {'user', 'publication', 'remix'}
+# Types recorded in imported_row, so a repeated import skips them
+TRACKED = REMAPPED | {'publication_comment', 'remix_comment'}
+# Link tables with unique constraints: duplicates are skipped on import
+LINK_TYPES = {'publication_like', 'remix_like', 'subscription'}
+# Columns that name files in the upload folder
+MEDIA_COLUMNS = {'user': 'avatar', 'publication': 'image', 'remix': 'image'}
+
+
+def export_data(directory, log=print):
+    os.makedirs(directory, exist_ok=True)
+    storage = get_storage()
+    counts = {}
+    media_added = set()
+
+    with gzip.open(os.path.join(directory, DATA_FILE), 'wt', encoding='utf-8') as data, \
+            tarfile.open(os.path.join(directory, MEDIA_FILE), 'w') as media:
+        _write_line(data, 'meta', {'version': FORMAT_VERSION, 'export_id': uuid.uuid4().hex,
+                                   'exported_at': datetime.utcnow().isoformat()})
+
+        for record_type, model, _ in TABLES:
+            count = 0
+            media_column = MEDIA_COLUMNS.get(record_type)
+            for row in _iter_rows(model):
+                _write_line(data, record_type, row)
+                count += 1
+
+                filename = row.get(media_column) if media_column else None
+                if filename and filename != DEFAULT_AVATAR and filename not in media_added:
+                    if _export_file(storage, media, filename):
+                        media_added.add(filename)
+            counts[record_type] = count
+            log(f'{record_type}: {count}')
+
+    counts['media'] = len(media_added)
+    log(f'media: {len(media_added)}')
+    return counts
+
+
+def import_data(directory, log=print):
+    counts = {}
+    media_names, counts['media'], renamed = _import_media(os.path.join(directory, MEDIA_FILE))
+    log(f"media: {counts['media']} ({renamed} renamed to avoid name collisions)")
+
+    id_maps = {record_type: {} for record_type in TRACKED}
+    models = {record_type: (model, fks) for record_type, model, fks in TABLES}
+    skipped, present = {}, {}
+    batch, batch_type = [], None
+    export_id = None
+
+    def flush():
+        if batch:
+            model, _ = models[batch_type]
+            done = id_maps.get(batch_type, {})
+            rows = [row for row in batch if row['id'] not in done]
+            present[batch_type] = present.get(batch_type, 0) + len(batch) - len(rows)
+            if rows:
+                inserted = _insert_batch(batch_type, model, rows, id_maps, export_id)
+                counts[batch_type] = counts.get(batch_type, 0) + inserted
+            batch.clear()
+
+    with gzip.open(os.path.join(directory, DATA_FILE), 'rt', encoding='utf-8') as data:
+        for line in data:
+            record = json.loads(line)
+            record_type, row = record['type'], record['data']
+            if record_type == 'meta':
+                if row.get('version') != FORMAT_VERSION:
+                    raise ValueError(f"Unsupported export version: {row.get('version')}")
+                # Exports made before export_id existed are told apart by their timestamp
+                export_id = row.get('export_id') or row.get('exported_at')
+                if not export_id:
+                    raise ValueError('Export has no id')
+                _load_imported(export_id, id_maps)
+                continue
+            if record_type not in models:
+                continue
+
+            if record_type != batch_type or len(batch) >= BATCH_SIZE:
+                flush()
+                batch_type = record_type
+
+            row = _remap_row(row, record_type, models[record_type][1], id_maps, media_names)
+            if row is None:
+                skipped[record_type] = skipped.get(record_type, 0) + 1
+                continue
+            batch.append(row)
+        flush()
+
+    for record_type, _, _ in TABLES:
+        log(f'{record_type}: {counts.get(record_type, 0)} imported, {present.get(record_type, 0)} already imported, '
+            f'{skipped.get(record_type, 0)} skipped')
+    counts['skipped'] = skipped
+    counts['already_imported'] = present
+    # Rows were inserted directly, past the counters (merged accounts gain likes too)
+    recompute_ratings(log=log)
+    # New publications must show up in the feed fragments cached by the running workers
+    bump_content_version(GLOBAL_SCOPE)
+    return counts
+
+
+def _iter_rows(model):
+    """Rows of a table as dicts, read in keyset-paginated batches."""
+    table = model.__table__
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(table).where(table.c.id > last_id).order_by(table.c.id).limit(BATCH_SIZE)
+        ).mappings().all()
+        if not rows:
+            return
+        for row in rows:
+            yield {key: value.isoformat() if isinstance(value, datetime) else value
+                   for key, value in row.items()}
+        last_id = rows[-1]['id']
+        # Read transactions end between batches so SQLite is not locked for the whole export
+        db.session.rollback()
+
+
+def _write_line(data, record_type, row):
+    data.write(json.dumps({'type': record_type, 'data': row}, ensure_ascii=False, separators=(',', ':')))
+    data.write('\n')
+
+
+def _remap_row(row, record_type, fks, id_maps, media_names):
+    """Rewrite foreign keys and file names to the target database; None if a parent is missing."""
+    for column, parent_type in fks.items():
+        value = row.get(column)
+        if value is None:
+            continue
+        new_id = id_maps[parent_type].get(value)
+        if new_id is None:
+            return None
+        row[column] = new_id
+    media_column = MEDIA_COLUMNS.get(record_type)
+    if media_column and row.get(media_column) in media_names:
+        row[media_column] = media_names[row[media_column]]
+    if row.get('created_at'):
+        row['created_at'] = datetime.fromisoformat(row['created_at'])
+    return row
+
+
+def _load_imported(export_id, id_maps):
+    """Fill the id maps with the rows a previous run of this export already imported."""
+    rows = db.session.execute(select(ImportedRow.record_type, ImportedRow.source_id, ImportedRow.target_id)
+                              .where(ImportedRow.export_id == export_id))
+    for record_type, source_id, target_id in rows:
+        if record_type in id_maps:
+            id_maps[record_type][source_id] = target_id
+    db.session.rollback()
+
+
+def _insert_batch(record_type, model, rows, id_maps, export_id):
+    table = model.__table__
+    imported = {}
+
+    if record_type == 'user':
+        # Existing accounts (same email) are reused instead of duplicated
+        emails = [row['email'] for row in rows]
+        existing = dict(db.session.execute(select(User.email, User.id).where(User.email.in_(emails))).all())
+        for row in rows:
+            if row['email'] in existing:
+                imported[row['id']] = existing[row['email']]
+        rows = [row for row in rows if row['email'] not in existing]
+
+    if record_type in TRACKED:
+        if rows:
+            old_ids = [row.pop('id') for row in rows]
+            new_ids = db.session.execute(
+                insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+            ).scalars().all()
+            imported.update(zip(old_ids, new_ids))
+        # Recorded in the batch's own transaction: a retried import resumes after the last commit
+        db.session.execute(insert(ImportedRow), [
+            {'export_id': export_id, 'record_type': record_type, 'source_id': old_id, 'target_id': new_id}
+            for old_id, new_id in imported.items()])
+        id_maps[record_type].update(imported)
+    else:
+        for row in rows:
+            row.pop('id', None)
+        statement = insert(table)
+        if record_type in LINK_TYPES:
+            statement = statement.prefix_with('OR IGNORE', dialect='sqlite')
+        result = db.session.execute(statement, rows)
+        if result.rowcount >= 0:
+            db.session.commit()
+            return result.rowcount
+
+    db.session.commit()
+    return len(rows)
+
+
+def _export_file(storage, media, filename):
+    """Stream one stored file into the tar; False if it is missing."""
+    try:
+        stream, size = storage.open(filename)
+    except (FileNotFoundError, ValueError):
+        return False
+    try:
+        info = tarfile.TarInfo(filename)
+        info.size = size
+        media.addfile(info, stream)
+    finally:
+        stream.close()
+    return True
+
+
+def _import_media(path):
+    """Copy media files into the upload storage.
+
+    Returns ({exported name: stored name}, files written, files renamed). A file
+    whose name is free is stored as is; if the name holds the same content it is
+    reused; otherwise the file is stored as <content hash>_<name>.
+    """
+    names, extracted, renamed = {}, 0, 0
+    if not os.path.exists(path):
+        return names, extracted, renamed
+    storage = get_storage()
+    with tarfile.open(path, 'r|*') as media:
+        for member in media:
+            if not member.isfile():
+                continue
+            # Only plain names: nothing can be written outside the upload storage
+            filename = secure_filename(os.path.basename(member.name))
+            if not filename:
+                continue
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+                digest = _copy_hashed(media.extractfile(member), spool)
+                spool.seek(0)
+                stored = filename
+                if storage.exists(filename) and _stored_digest(storage, filename) != digest:
+                    stored = f'{digest[:16]}_{filename}'
+                    renamed += 1
+                if not storage.exists(stored):
+                    storage.save(stored, spool)
+                    extracted += 1
+            names[member.name] = stored
+    return names, extracted, renamed
+
+
+def _copy_hashed(source, target):
+    sha = hashlib.sha256()
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            return sha.hexdigest()
+        sha.update(chunk)
+        target.write(chunk)
+
+
+def _stored_digest(storage, filename):
+    stream, _ = storage.open(filename)
+    try:
+        sha = hashlib.sha256()
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            sha.update(chunk)
+        return sha.hexdigest()
+    finally:
+        stream.close()